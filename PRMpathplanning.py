@@ -1,159 +1,125 @@
+import os
 import random
-import math
-import heapq
-import matplotlib.pyplot as plt
 import numpy as np
-from PIL import Image, ImageOps, ImageDraw
-
-class Node:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.edges = []
-
-    def add_edge(self, node):
-        self.edges.append(node)
-
-    def __lt__(self, other):
-        return (self.x, self.y) < (other.x, other.y)
-
-    def __hash__(self):
-        return hash((self.x, self.y))
-
-    def __eq__(self, other):
-        return (self.x, self.y) == (other.x, other.y)
-
-def distance(node1, node2):
-    return math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
+from prmplanner.neighbors import build_index, knn_edges
+from prmplanner.collision import OccupancyGrid, segments_in_occupancy
+from prmplanner.parallel import parallel_knn_edges
+from prmplanner.pyramid import OccupancyPyramid
+from prmplanner.occupancy import CACHE_DIR, load_inflated_map
+from prmplanner.storage import RoadmapArrays, array_hash
+from prmplanner.nodestore import NodeStore
+from prmplanner.samplers import make_sampler
+from prmplanner.smoothing import smooth_path
+from prmplanner.stats import NULL_STATS, PlannerStats
+from prmplanner.viz import plot_roadmap
 
 def is_in_obstacle(x, y, inflated_obstacle_map):
     return inflated_obstacle_map[int(y), int(x)] == 0
 
 def line_in_obstacle(x0, y0, x1, y1, inflated_obstacle_map):
-    x0, y0, x1, y1 = int(x0), int(y0), int(x1), int(y1)
-    line_points = list(bresenham(x0, y0, x1, y1))
-    for x, y in line_points:
-        if inflated_obstacle_map[y, x] == 0:
-            return True
-    return False
-
-def bresenham(x0, y0, x1, y1):
-    dx = abs(x1 - x0)
-    dy = abs(y1 - y0)
-    sx = 1 if x0 < x1 else -1
-    sy = 1 if y0 < y1 else -1
-    err = dx - dy
-
+    return bool(segments_in_occupancy((x0, y0), (x1, y1), inflated_obstacle_map)[0])
+
+def generate_random_nodes(num_nodes, x_max, y_max, inflated_obstacle_map, stats=NULL_STATS, sampler='uniform'):
+    with stats.stage('sample'):
+        sampler = make_sampler(sampler, (x_max, y_max), OccupancyGrid(inflated_obstacle_map), seed=random.getrandbits(32))
+        points = sampler.sample(num_nodes)
+    stats.count('samples_drawn', sampler.drawn)
+    stats.count('samples_rejected', sampler.rejected)
+    stats.count('samples_accepted', len(points))
+    return NodeStore.from_points(points)
+
+def connect_nodes(nodes, k, inflated_obstacle_map, neighbor_method='kdtree', candidates=None, workers=None, stats=NULL_STATS, lazy=False):
+    if candidates is None:
+        candidates = k if lazy else 3 * k
+    points = np.asarray(nodes.points, dtype=float)
+    checker = None if lazy else OccupancyPyramid(inflated_obstacle_map)
+    with stats.stage('index'):
+        index = build_index(points, neighbor_method)
+    if workers and workers > 1:
+        with stats.stage('parallel_connect'):
+            rows, cols = parallel_knn_edges(points, k, checker, candidates, neighbor_method, workers, stats=stats, index=index)
+    else:
+        rows, cols = knn_edges(index, k, checker, candidates, stats=stats)
+    with stats.stage('graph'):
+        nodes.set_edges(rows, cols)
+    stats.count('edges_added', len(rows))
+
+def a_star(start, goal, stats=NULL_STATS):
+    with stats.stage('search'):
+        path, expanded = _a_star(start, goal)
+    stats.count('nodes_expanded', expanded)
+    return path
+
+def lazy_a_star(start, goal, inflated_obstacle_map, edge_valid=None, stats=NULL_STATS):
+    if edge_valid is None:
+        edge_valid = {}
     while True:
-        yield x0, y0
-        if x0 == x1 and y0 == y1:
-            break
-        e2 = err * 2
-        if e2 > -dy:
-            err -= dy
-            x0 += sx
-        if e2 < dx:
-            err += dx
-            y0 += sy
-            
-def generate_random_nodes(num_nodes, x_max, y_max, inflated_obstacle_map):
-    nodes = []
-    while len(nodes) < num_nodes:
-        x = random.uniform(0, x_max)
-        y = random.uniform(0, y_max)
-        if not is_in_obstacle(x, y, inflated_obstacle_map):
-            nodes.append(Node(x, y))
-    return nodes
-
-def connect_nodes(nodes, k, inflated_obstacle_map):
-    for node in nodes:
-        distances = []
-        for other_node in nodes:
-            if node != other_node and not line_in_obstacle(node.x, node.y, other_node.x, other_node.y, inflated_obstacle_map):
-                distances.append((distance(node, other_node), other_node))
-        distances.sort(key=lambda x: x[0])
-        for d, other_node in distances[:k]:
-            node.add_edge(other_node)
-            other_node.add_edge(node)
-            
-def a_star(start, goal):
-    open_list = []
-    heapq.heappush(open_list, (0, start))
-    came_from = {}
-    g_score = {node: float('inf') for node in nodes}
-    g_score[start] = 0
-    f_score = {node: float('inf') for node in nodes}
-    f_score[start] = distance(start, goal)
-
-    while open_list:
-        _, current = heapq.heappop(open_list)
-
-        if current == goal:
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            path.append(start)
-            return path[::-1]
-
-        for neighbor in current.edges:
-            tentative_g_score = g_score[current] + distance(current, neighbor)
-            if tentative_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = tentative_g_score + distance(neighbor, goal)
-                heapq.heappush(open_list, (f_score[neighbor], neighbor))
-
-    return None
-
-def plot_prm(nodes, path=None, obstacle_map=None):
-    if obstacle_map is not None:
-        plt.imshow(obstacle_map, cmap='gray', origin='lower')
-
-    for node in nodes:
-        for edge in node.edges:
-            plt.plot([node.x, edge.x], [node.y, edge.y], 'k-', lw=0.5)
+        path = a_star(start, goal, stats=stats)
+        if not path:
+            return path
+        pairs = [(a, b) if a < b else (b, a) for a, b in zip(path, path[1:])]
+        pairs = [key for key in dict.fromkeys(pairs) if key not in edge_valid]
+        if not pairs:
+            return path
+        stats.count('collision_checks', len(pairs))
+        with stats.stage('collision'):
+            blocked = segments_in_occupancy([(a.x, a.y) for a, _ in pairs], [(b.x, b.y) for _, b in pairs], inflated_obstacle_map)
+        for (a, b), hit in zip(pairs, blocked):
+            edge_valid[(a, b)] = not hit
+            if hit:
+                a.store.remove_edge(a.id, b.id)
+        if not blocked.any():
+            return path
+        stats.count('lazy_replans')
+
+def _a_star(start, goal):
+    store = start.store
+    path, expanded = store.shortest_path(start.id, goal.id)
+    return [store[i] for i in path] or None, expanded
+
+def plot_prm(nodes, path=None, obstacle_map=None, smoothed=None, output=None):
+    rows, cols, costs = nodes.edge_pairs()
+    keep = np.isfinite(costs)
+    path = [(node.x, node.y) for node in path] if path else None
+    plot_roadmap(nodes.points, rows[keep], cols[keep], path, smoothed, obstacle_map, start=(nodes[0].x, nodes[0].y), goal=(nodes[-1].x, nodes[-1].y), output=output)
+
+if __name__ == '__main__':
+    num_nodes = 100
+    x_max = 1200
+    y_max = 800
+    k = 5
+
+    robot_radius = 5
+    stats = PlannerStats()
+
+    image_path = 'Obsticle.png'
+    obstacle_map, inflated_obstacle_map, clearance = load_inflated_map(image_path, robot_radius)
+
+    roadmap_path = os.path.join(CACHE_DIR, 'Obsticle_roadmap')
+    roadmap_params = {'num_nodes': num_nodes, 'x_max': x_max, 'y_max': y_max, 'k': k, 'robot_radius': robot_radius}
+    map_hash = array_hash(inflated_obstacle_map)
+    roadmap = RoadmapArrays.load(roadmap_path, map_hash, roadmap_params)
+    if roadmap is None:
+        nodes = generate_random_nodes(num_nodes, x_max, y_max, inflated_obstacle_map, stats=stats)
+        connect_nodes(nodes, k, inflated_obstacle_map, stats=stats)
+        nodes.to_arrays().save(roadmap_path, map_hash, roadmap_params)
+    else:
+        nodes = NodeStore.from_arrays(roadmap)
+
+    start = nodes[0]
+    goal = nodes[-1]
+    path = a_star(start, goal, stats=stats)
+    smoothed = None
 
     if path:
-        path_x = [node.x for node in path]
-        path_y = [node.y for node in path]
-        plt.plot(path_x, path_y, 'r-', lw=2)
-
-    plt.scatter([node.x for node in nodes], [node.y for node in nodes], c='b')
-    plt.scatter([start.x], [start.y], c='g', marker='o')
-    plt.scatter([goal.x], [goal.y], c='r', marker='x')
-    plt.show()
-    
-num_nodes = 100
-x_max = 1200
-y_max = 800
-k = 5
-
-image_path = 'Obsticle.png'
-original_image = Image.open(image_path).convert('L')
-obstacle_map = np.array(original_image)
-
-inflated_obstacle_map = ImageOps.expand(original_image, border=5, fill=255) 
-draw = ImageDraw.Draw(inflated_obstacle_map)
-for y in range(obstacle_map.shape[0]):
-    for x in range(obstacle_map.shape[1]):
-        if obstacle_map[y, x] == 0:
-            draw.rectangle([x, y, x + 10, y + 10], fill=0)
-
-inflated_obstacle_map = np.array(inflated_obstacle_map)
-
-nodes = generate_random_nodes(num_nodes, x_max, y_max, inflated_obstacle_map)
-connect_nodes(nodes, k, inflated_obstacle_map)
-
-start = nodes[0]
-goal = nodes[-1]
-path = a_star(start, goal)
-
-if path:
-    print("Path found:")
-    for node in path:
-        print(f"Node: ({node.x}, {node.y})")
-else:
-    print("No path found")
-
-plot_prm(nodes, path, obstacle_map)
+        print("Path found:")
+        for node in path:
+            print(f"Node: ({node.x}, {node.y})")
+        with stats.stage('smooth'):
+            smoothed, smoothed_length = smooth_path([(node.x, node.y) for node in path], OccupancyGrid(inflated_obstacle_map))
+        print(f"Smoothed length: {smoothed_length:.1f} ({len(smoothed)} points)")
+    else:
+        print("No path found")
+    print(stats.summary())
+
+    plot_prm(nodes, path, obstacle_map, smoothed)
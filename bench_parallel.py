@@ -0,0 +1,42 @@
+import argparse
+import os
+import time
+import numpy as np
+from prmplanner.collision import OccupancyGrid
+from prmplanner.neighbors import build_index, knn_edges
+from prmplanner.occupancy import load_inflated_map
+from prmplanner.parallel import parallel_knn_edges
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare serial and process-pool roadmap edge construction.')
+    parser.add_argument('--map', default='Obsticle.png')
+    parser.add_argument('--nodes', type=int, default=20000)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, os.cpu_count() or 1])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    _, inflated_map, _ = load_inflated_map(args.map)
+    checker = OccupancyGrid(inflated_map)
+    rng = np.random.default_rng(args.seed)
+    points = rng.uniform((0, 0), checker.map_size, (args.nodes * 2, 2))
+    points = points[~checker.points_in_obstacle(points)][:args.nodes]
+
+    start = time.perf_counter()
+    serial = knn_edges(build_index(points), args.k, checker, 3 * args.k)
+    baseline = time.perf_counter() - start
+    print(f'{len(points)} nodes, k={args.k}, {os.cpu_count()} cpus')
+    print(f'workers=1  {baseline:8.3f} s  speedup 1.00')
+    for workers in sorted(set(args.workers)):
+        if workers < 2:
+            continue
+        start = time.perf_counter()
+        rows, cols = parallel_knn_edges(points, args.k, checker, 3 * args.k, workers=workers)
+        elapsed = time.perf_counter() - start
+        same = np.array_equal(rows, serial[0]) and np.array_equal(cols, serial[1])
+        print(f'workers={workers:<2} {elapsed:8.3f} s  speedup {baseline / elapsed:.2f}{"" if same else "  MISMATCH"}')
+
+
+if __name__ == '__main__':
+    main()
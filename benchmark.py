@@ -0,0 +1,186 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+from prmplanner.collision import OccupancyGrid
+from prmplanner.occupancy import load_inflated_map
+from prmplanner.roadmap import PRM
+import PRMpathplanning as pipeline
+
+RECT_MAP = {'map_size': (13, 13), 'obstacles': [(2, 2, 3, 10), (4, 4, 10, 5), (4, 8, 10, 9)], 'start': (1, 1), 'goal': (12, 12)}
+MAPS = ['rects', 'Obsticle.png', 'FloorPlan.png']
+PIPELINES = ['prm', 'functional']
+
+
+class StageRecorder:
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.peak_bytes = 0
+
+    @contextmanager
+    def stage(self, name):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                self.peak_bytes = max(self.peak_bytes, peak)
+                self.stages[name] = {'peak_bytes': max(peak - base, 0)}
+            else:
+                self.stages[name] = {'seconds': elapsed}
+
+
+def path_length(points):
+    if len(points) < 2:
+        return 0.0
+    points = np.asarray(points, dtype=float)
+    return float(np.linalg.norm(np.diff(points, axis=0), axis=1).sum())
+
+
+def seed_everything(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def free_points(checker, count, seed):
+    rng = np.random.default_rng(seed)
+    points = np.empty((0, 2))
+    while len(points) < count:
+        samples = rng.uniform((0, 0), checker.map_size, (1024, 2))
+        points = np.vstack([points, samples[~checker.points_in_obstacle(samples)]])
+    return [tuple(p) for p in points[:count].tolist()]
+
+
+def run_prm(recorder, map_name, num_nodes, k, seed):
+    if map_name == 'rects':
+        map_size, obstacles = RECT_MAP['map_size'], RECT_MAP['obstacles']
+        start, goal = RECT_MAP['start'], RECT_MAP['goal']
+    else:
+        with recorder.stage('inflate'):
+            _, inflated_map, _ = load_inflated_map(map_name, cache_dir=None)
+        obstacles = OccupancyGrid(inflated_map)
+        map_size = obstacles.map_size
+        start, goal = free_points(obstacles, 2, seed)
+    seed_everything(seed)
+    prm = PRM(start, goal, num_nodes, map_size, obstacles, k)
+    with recorder.stage('sample'):
+        prm.sample_nodes()
+    with recorder.stage('connect'):
+        prm.connect_nodes()
+    with recorder.stage('search'):
+        path = prm.a_star(0, 1)
+    return recorder.stages, path, len(prm.nodes), len(prm.edge_set)
+
+
+def run_functional(recorder, map_name, num_nodes, k, seed):
+    with recorder.stage('inflate'):
+        _, inflated_map, _ = load_inflated_map(map_name, cache_dir=None)
+    height, width = inflated_map.shape
+    seed_everything(seed)
+    with recorder.stage('sample'):
+        nodes = pipeline.generate_random_nodes(num_nodes, width - 1, height - 1, inflated_map)
+    with recorder.stage('connect'):
+        pipeline.connect_nodes(nodes, k, inflated_map)
+    with recorder.stage('search'):
+        path = pipeline.a_star(nodes[0], nodes[-1]) or []
+    num_edges = nodes.num_edges
+    return recorder.stages, [(node.x, node.y) for node in path], len(nodes), num_edges
+
+
+RUNNERS = {'prm': run_prm, 'functional': run_functional}
+
+
+def git_version():
+    try:
+        out = subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_case(pipeline_name, map_name, num_nodes, k, seed, trace_memory=True):
+    runner = RUNNERS[pipeline_name]
+    timing = StageRecorder()
+    start = time.perf_counter()
+    stages, path, nodes, edges = runner(timing, map_name, num_nodes, k, seed)
+    total = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        memory = StageRecorder(trace_memory=True)
+        tracemalloc.start()
+        try:
+            runner(memory, map_name, num_nodes, k, seed)
+            peak = max(memory.peak_bytes, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+        for name, stats in memory.stages.items():
+            stages[name].update(stats)
+    return {
+        'pipeline': pipeline_name,
+        'map': map_name,
+        'num_nodes': num_nodes,
+        'k': k,
+        'seed': seed,
+        'nodes': nodes,
+        'edges': edges,
+        'stages': stages,
+        'total_seconds': total,
+        'peak_bytes': peak,
+        'path_found': len(path) > 0,
+        'path_nodes': len(path),
+        'path_length': path_length(path),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless PRM build and query benchmark.')
+    parser.add_argument('--pipelines', nargs='+', choices=PIPELINES, default=PIPELINES)
+    parser.add_argument('--maps', nargs='+', default=MAPS)
+    parser.add_argument('--nodes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--k', type=int, nargs='+', default=[5, 10])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    args = parser.parse_args(argv)
+
+    results = []
+    for pipeline_name in args.pipelines:
+        for map_name in args.maps:
+            if pipeline_name == 'functional' and map_name == 'rects':
+                continue
+            for num_nodes in args.nodes:
+                for k in args.k:
+                    result = run_case(pipeline_name, map_name, num_nodes, k, args.seed, not args.no_memory)
+                    results.append(result)
+                    print(f"{pipeline_name:<10} {map_name:<14} n={num_nodes:<7} k={k:<3} {result['total_seconds']:8.3f} s", file=sys.stderr)
+
+    report = {
+        'version': git_version(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
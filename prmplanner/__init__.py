@@ -0,0 +1,20 @@
+from .collision import OccupancyGrid, RectObstacles
+from .occupancy import load_inflated_map, load_pyramid
+from .pyramid import OccupancyPyramid
+from .roadmap import PRM, Roadmap
+from .smoothing import path_length, smooth_path
+from .stats import NULL_STATS, PlannerStats
+
+__all__ = [
+    'NULL_STATS',
+    'OccupancyGrid',
+    'OccupancyPyramid',
+    'PRM',
+    'PlannerStats',
+    'RectObstacles',
+    'Roadmap',
+    'load_inflated_map',
+    'load_pyramid',
+    'path_length',
+    'smooth_path',
+]
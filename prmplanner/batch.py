@@ -0,0 +1,76 @@
+import heapq
+import time
+import concurrent.futures
+
+EXECUTORS = ('thread', 'process')
+
+_worker = {}
+
+
+def shortest_path_tree(adjacency, source, targets=None, limit=None):
+    remaining = set(targets) if targets is not None else None
+    dist = {source: 0.0}
+    parent = {}
+    closed = set()
+    open_list = [(0.0, source)]
+    while open_list:
+        d, current = heapq.heappop(open_list)
+        if current in closed:
+            continue
+        closed.add(current)
+        if remaining is not None:
+            remaining.discard(current)
+            if not remaining:
+                break
+        # ids from limit on are other queries' temporary endpoints: they can
+        # be reached as targets but no path may pass through them
+        if limit is not None and current >= limit and current != source:
+            continue
+        for neighbor, cost in adjacency[current]:
+            nd = d + cost
+            if neighbor not in closed and nd < dist.get(neighbor, float('inf')):
+                dist[neighbor] = nd
+                parent[neighbor] = current
+                heapq.heappush(open_list, (nd, neighbor))
+    return dist, parent, len(closed)
+
+
+def tree_path(parent, start, goal):
+    if start != goal and start not in parent:
+        return []
+    path = [start]
+    while path[-1] != goal:
+        path.append(parent[path[-1]])
+    return path
+
+
+def solve_group(adjacency, goal, starts, limit=None):
+    begin = time.perf_counter()
+    dist, parent, expanded = shortest_path_tree(adjacency, goal, starts, limit)
+    paths = [tree_path(parent, start, goal) for start in starts]
+    costs = [dist.get(start, float('inf')) for start in starts]
+    return paths, costs, expanded, time.perf_counter() - begin
+
+
+def _init_worker(adjacency):
+    _worker['adjacency'] = adjacency
+
+
+def _solve_task(args):
+    return solve_group(_worker['adjacency'], *args)
+
+
+def solve_groups(adjacency, groups, workers=None, executor='thread', limit=None):
+    if executor not in EXECUTORS:
+        raise ValueError(f'unknown executor {executor!r}, expected one of {sorted(EXECUTORS)}')
+    groups = [(goal, starts, limit) for goal, starts in groups]
+    if not workers or workers < 2 or len(groups) < 2:
+        return [solve_group(adjacency, *group) for group in groups]
+    workers = min(workers, len(groups))
+    if executor == 'process':
+        with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(adjacency,)) as pool:
+            return list(pool.map(_solve_task, groups))
+    # the search is pure Python, so threads only overlap it with the caller;
+    # use executor='process' for an actual speedup on large batches
+    with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(lambda group: solve_group(adjacency, *group), groups))
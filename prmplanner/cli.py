@@ -0,0 +1,116 @@
+import argparse
+import json
+import sys
+import numpy as np
+from .occupancy import load_inflated_map
+from .pyramid import OccupancyPyramid
+from .roadmap import PRM, Roadmap
+from .samplers import SAMPLERS
+from .smoothing import path_length
+from .stats import PlannerStats
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='prmplanner', description='Plan a path on a map without any display and write the result as JSON.')
+    parser.add_argument('--config', help='JSON file with default values for any of the options below')
+    parser.add_argument('--map', help='obstacle image; dark pixels are obstacles')
+    parser.add_argument('--rects', help='JSON list of [x0, y0, x1, y1] obstacles, used when --map is not given')
+    parser.add_argument('--map-size', type=float, nargs=2, default=None, help='map width and height for --rects')
+    parser.add_argument('--robot-radius', type=int, default=5)
+    parser.add_argument('--start', type=float, nargs=2)
+    parser.add_argument('--goal', type=float, nargs=2)
+    parser.add_argument('--nodes', type=int, default=1000)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--sampler', choices=sorted(SAMPLERS), default='uniform')
+    parser.add_argument('--uniform-fraction', type=float, default=None, help='share of plain uniform samples mixed into the gaussian and bridge samplers')
+    parser.add_argument('--neighbor-method', default='kdtree')
+    parser.add_argument('--lazy', action='store_true')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--smooth', action='store_true', help='shortcut and smooth the path')
+    parser.add_argument('--time-budget', type=float, default=None, help='grow the roadmap in batches and keep the best path found within this many seconds')
+    parser.add_argument('--roadmap', help='roadmap cache directory to load from or save to')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    parser.add_argument('--plot', help='save a PNG of the roadmap and path here')
+    return parser
+
+
+def parse_args(argv=None):
+    parser = build_parser()
+    args, _ = parser.parse_known_args(argv)
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+        parser.set_defaults(**{key.replace('-', '_'): value for key, value in config.items()})
+    args = parser.parse_args(argv)
+    if args.start is None or args.goal is None:
+        parser.error('--start and --goal are required (on the command line or in --config)')
+    if args.map is None and args.rects is None:
+        parser.error('one of --map or --rects is required')
+    if args.uniform_fraction is not None and args.sampler not in ('gaussian', 'bridge'):
+        parser.error('--uniform-fraction only applies to the gaussian and bridge samplers')
+    if args.time_budget is not None and args.roadmap is not None:
+        parser.error('--roadmap cannot be used with --time-budget, which grows a fresh roadmap for the query')
+    return args
+
+
+def load_obstacles(args):
+    if args.map is not None:
+        obstacle_map, inflated_map, _ = load_inflated_map(args.map, args.robot_radius)
+        checker = OccupancyPyramid(inflated_map, obstacle_map=obstacle_map, robot_radius=args.robot_radius)
+        return checker.map_size, checker, obstacle_map, None
+    rects = json.loads(args.rects) if isinstance(args.rects, str) else args.rects
+    if args.map_size is None:
+        raise SystemExit('--map-size is required with --rects')
+    return tuple(args.map_size), rects, None, rects
+
+
+def plan(args):
+    np.random.seed(args.seed)
+    stats = PlannerStats()
+    map_size, obstacles, obstacle_map, rects = load_obstacles(args)
+    sampler_options = {} if args.uniform_fraction is None else {'uniform_fraction': args.uniform_fraction}
+    if args.time_budget is not None:
+        roadmap = PRM(tuple(args.start), tuple(args.goal), args.nodes, map_size, obstacles, args.k, args.neighbor_method, args.workers, stats, args.lazy, args.sampler, sampler_options)
+        path = roadmap.find_path(time_budget=args.time_budget)
+    else:
+        roadmap = Roadmap(map_size, obstacles, args.nodes, args.k, args.neighbor_method, args.workers, stats, args.lazy, args.sampler, sampler_options)
+        if args.roadmap is None or not roadmap.load(args.roadmap):
+            roadmap.build()
+            if args.roadmap is not None:
+                roadmap.save(args.roadmap)
+        path = roadmap.query(tuple(args.start), tuple(args.goal))
+    smoothed, smoothed_length = roadmap.smooth(path, seed=args.seed) if args.smooth and path else (None, None)
+    result = {
+        'start': list(args.start),
+        'goal': list(args.goal),
+        'path_found': bool(path),
+        'path': [list(p) for p in path],
+        'path_length': path_length(path),
+        'smoothed_path': [list(p) for p in smoothed] if smoothed else None,
+        'smoothed_length': smoothed_length,
+        'nodes': len(roadmap.nodes),
+        'edges': len(roadmap.edge_set),
+        'stats': stats.as_dict(),
+    }
+    if args.plot:
+        from .viz import plot_roadmap
+        pairs = np.array(sorted(roadmap.edge_set), dtype=np.int64).reshape(-1, 2)
+        plot_roadmap(roadmap.nodes, pairs[:, 0], pairs[:, 1], path, smoothed, obstacle_map, rects, output=args.plot)
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = plan(args)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0 if result['path_found'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
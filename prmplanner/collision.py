@@ -0,0 +1,143 @@
+import numpy as np
+from .occupancy import apply_patch
+from .storage import array_hash
+
+
+def as_rects(obstacles):
+    rects = np.asarray(obstacles, dtype=float).reshape(-1, 4)
+    return np.column_stack([
+        np.minimum(rects[:, 0], rects[:, 2]), np.minimum(rects[:, 1], rects[:, 3]),
+        np.maximum(rects[:, 0], rects[:, 2]), np.maximum(rects[:, 1], rects[:, 3]),
+    ])
+
+
+def points_in_rects(points, rects):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    x = points[:, 0:1]
+    y = points[:, 1:2]
+    inside = (rects[:, 0] <= x) & (x <= rects[:, 2]) & (rects[:, 1] <= y) & (y <= rects[:, 3])
+    return inside.any(axis=1)
+
+
+def segments_intersect_rects(starts, ends, rects, chunk_size=1 << 20):
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    hit = np.zeros(len(starts), dtype=bool)
+    if len(rects) == 0:
+        return hit
+    step = max(1, chunk_size // len(rects))
+    for lo in range(0, len(starts), step):
+        hit[lo:lo + step] = _slab_test(starts[lo:lo + step], ends[lo:lo + step], rects)
+    return hit
+
+
+def _slab_test(starts, ends, rects):
+    t_enter = np.zeros((len(starts), len(rects)))
+    t_exit = np.ones((len(starts), len(rects)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for axis in (0, 1):
+            p = starts[:, axis:axis + 1]
+            d = ends[:, axis:axis + 1] - p
+            t0 = (rects[:, axis] - p) / d
+            t1 = (rects[:, axis + 2] - p) / d
+            parallel = d == 0
+            outside = parallel & ((p < rects[:, axis]) | (p > rects[:, axis + 2]))
+            t_near = np.where(parallel, -np.inf, np.minimum(t0, t1))
+            t_far = np.where(parallel, np.inf, np.maximum(t0, t1))
+            t_far = np.where(outside, -np.inf, t_far)
+            t_enter = np.maximum(t_enter, t_near)
+            t_exit = np.minimum(t_exit, t_far)
+    return (t_enter <= t_exit).any(axis=1)
+
+
+class RectObstacles:
+    def __init__(self, obstacles):
+        self.rects = as_rects(obstacles)
+
+    def __len__(self):
+        return len(self.rects)
+
+    def points_in_obstacle(self, points):
+        return points_in_rects(points, self.rects)
+
+    def segments_in_obstacle(self, starts, ends):
+        return segments_intersect_rects(starts, ends, self.rects)
+
+    def fingerprint(self):
+        return array_hash(self.rects)
+
+    def add(self, rect):
+        self.rects = np.vstack([self.rects, as_rects(rect)])
+        return len(self.rects) - 1
+
+    def remove(self, index):
+        rect = self.rects[index].copy()
+        self.rects = np.delete(self.rects, index, axis=0)
+        return rect
+
+    def replace(self, index, rect):
+        old = self.rects[index].copy()
+        self.rects = self.rects.copy()
+        self.rects[index] = as_rects(rect)[0]
+        return old
+
+
+def points_in_occupancy(points, occupancy_map):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    height, width = occupancy_map.shape[:2]
+    x = np.clip(points[:, 0].astype(np.int64), 0, width - 1)
+    y = np.clip(points[:, 1].astype(np.int64), 0, height - 1)
+    return occupancy_map[y, x] == 0
+
+
+def segments_in_occupancy(starts, ends, occupancy_map, chunk_size=1 << 22):
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2).astype(np.int64)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2).astype(np.int64)
+    height, width = occupancy_map.shape[:2]
+    counts = np.abs(ends - starts).max(axis=1) + 1
+    hit = np.zeros(len(starts), dtype=bool)
+    lo = 0
+    while lo < len(starts):
+        hi = lo + max(1, int(np.searchsorted(np.cumsum(counts[lo:]), chunk_size)))
+        n = counts[lo:hi]
+        seg = np.repeat(np.arange(hi - lo), n)
+        offsets = np.arange(len(seg)) - np.repeat(np.cumsum(n) - n, n)
+        t = offsets / np.maximum(n - 1, 1)[seg]
+        p = starts[lo:hi][seg]
+        d = (ends[lo:hi] - starts[lo:hi])[seg]
+        x = np.clip(np.rint(p[:, 0] + t * d[:, 0]).astype(np.int64), 0, width - 1)
+        y = np.clip(np.rint(p[:, 1] + t * d[:, 1]).astype(np.int64), 0, height - 1)
+        blocked = occupancy_map[y, x] == 0
+        hit[lo:hi] = np.logical_or.reduceat(blocked, np.cumsum(n) - n)
+        lo = hi
+    return hit
+
+
+class OccupancyGrid:
+    # robot_radius is the inflation occupancy_map was built with; updates
+    # need the obstacle map it came from to re-inflate a patch
+    def __init__(self, occupancy_map, obstacle_map=None, robot_radius=0, threshold=0):
+        self.occupancy_map = np.asarray(occupancy_map)
+        self.obstacle_map = obstacle_map
+        self.robot_radius = robot_radius
+        self.threshold = threshold
+
+    @property
+    def map_size(self):
+        return (self.occupancy_map.shape[1], self.occupancy_map.shape[0])
+
+    def points_in_obstacle(self, points):
+        return points_in_occupancy(points, self.occupancy_map)
+
+    def segments_in_obstacle(self, starts, ends):
+        return segments_in_occupancy(starts, ends, self.occupancy_map)
+
+    def fingerprint(self):
+        return array_hash(self.occupancy_map)
+
+    def update(self, x, y, patch):
+        if not self.occupancy_map.flags.writeable:
+            self.occupancy_map = np.array(self.occupancy_map)
+        if self.obstacle_map is not None and not self.obstacle_map.flags.writeable:
+            self.obstacle_map = np.array(self.obstacle_map)
+        return apply_patch(self.occupancy_map, self.obstacle_map, x, y, patch, self.robot_radius, self.threshold)
@@ -0,0 +1,115 @@
+import numpy as np
+
+
+class UnionFind:
+    def __init__(self, size=0):
+        self.parent = list(range(size))
+        self.size = [1] * size
+        self.count = size
+        self._log = None
+        self._marks = []
+
+    def __len__(self):
+        return len(self.parent)
+
+    @classmethod
+    def from_edges(cls, size, rows, cols):
+        components = cls(size)
+        for i, j in zip(rows, cols):
+            components.union(i, j)
+        return components
+
+    @classmethod
+    def from_labels(cls, labels):
+        # labels name each node's component by one of its members, which
+        # becomes the root; only root sizes are ever read
+        labels = np.asarray(labels, dtype=np.int64)
+        components = cls()
+        components.parent = labels.tolist()
+        components.size = np.bincount(labels, minlength=len(labels)).tolist()
+        components.count = int(np.count_nonzero(labels == np.arange(len(labels))))
+        return components
+
+    def add(self):
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        self.count += 1
+        return len(self.parent) - 1
+
+    def _set(self, i, parent, size):
+        if self._log is not None:
+            self._log.append((i, self.parent[i], self.size[i]))
+        self.parent[i] = parent
+        self.size[i] = size
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            grandparent = parent[parent[i]]
+            if grandparent != parent[i]:
+                self._set(i, grandparent, self.size[i])
+            i = grandparent
+        return i
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return False
+        if self.size[i] < self.size[j]:
+            i, j = j, i
+        self._set(j, i, self.size[j])
+        self._set(i, i, self.size[i] + self.size[j])
+        self.count -= 1
+        return True
+
+    def connected(self, i, j):
+        return self.find(i) == self.find(j)
+
+    def component_size(self, i):
+        return self.size[self.find(i)]
+
+    @property
+    def tracking(self):
+        return self._log is not None
+
+    def checkpoint(self):
+        # checkpoints nest: one log is kept while any is open and each mark
+        # remembers how much of it belongs to the enclosing checkpoints
+        if self._log is None:
+            self._log = []
+        mark = (len(self.parent), self.count, len(self._log))
+        self._marks.append(mark)
+        return mark
+
+    def rollback(self, mark):
+        assert self._marks and self._marks[-1] == mark, 'roll back the innermost checkpoint first'
+        self._marks.pop()
+        length, count, logged = mark
+        for i, parent, size in reversed(self._log[logged:]):
+            self.parent[i] = parent
+            self.size[i] = size
+        del self._log[logged:]
+        del self.parent[length:]
+        del self.size[length:]
+        self.count = count
+        if not self._marks:
+            self._log = None
+
+def component_labels(num_nodes, rows, cols):
+    labels = np.arange(num_nodes)
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    while True:
+        row_labels, col_labels = labels[rows], labels[cols]
+        lowest = np.minimum(row_labels, col_labels)
+        hooked = labels.copy()
+        np.minimum.at(hooked, row_labels, lowest)
+        np.minimum.at(hooked, col_labels, lowest)
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+        if np.array_equal(hooked, labels):
+            return labels
+        labels = hooked
@@ -0,0 +1,131 @@
+import heapq
+import math
+import numpy as np
+
+
+def dijkstra_distances(adjacency, source, num_nodes=None):
+    dist = np.full(num_nodes or len(adjacency), np.inf)
+    dist[source] = 0.0
+    open_list = [(0.0, source)]
+    while open_list:
+        d, current = heapq.heappop(open_list)
+        if d > dist[current]:
+            continue
+        for neighbor, cost in adjacency[current]:
+            nd = d + cost
+            if neighbor < len(dist) and nd < dist[neighbor]:
+                dist[neighbor] = nd
+                heapq.heappush(open_list, (nd, neighbor))
+    return dist
+
+
+def select_landmarks(adjacency, num_nodes, count, seed=0):
+    rng = np.random.default_rng(seed)
+    if num_nodes == 0:
+        return [], np.empty((0, 0))
+    first = dijkstra_distances(adjacency, int(rng.integers(num_nodes)), num_nodes)
+    landmarks, rows = [], []
+    score = np.where(np.isfinite(first), first, -1.0)
+    while len(landmarks) < min(count, num_nodes):
+        landmark = int(np.argmax(score))
+        if score[landmark] < 0:
+            break
+        row = dijkstra_distances(adjacency, landmark, num_nodes)
+        landmarks.append(landmark)
+        rows.append(row)
+        score = np.minimum(score, np.where(np.isfinite(row), row, np.inf))
+        score[landmark] = -1.0
+    return landmarks, np.array(rows).reshape(len(rows), num_nodes)
+
+
+class LandmarkTable:
+    def __init__(self, landmarks, distances, all_pairs=False):
+        self.landmarks = np.asarray(landmarks, dtype=np.int32)
+        self.distances = np.asarray(distances, dtype=np.float32)
+        self.all_pairs = all_pairs
+        self._rows = None
+        finite = self.distances[np.isfinite(self.distances)]
+        self.tolerance = 4 * np.finfo(np.float32).eps * float(finite.max(initial=0.0))
+
+    @classmethod
+    def build(cls, adjacency, num_nodes, count=16, seed=0):
+        landmarks, distances = select_landmarks(adjacency, num_nodes, count, seed)
+        return cls(landmarks, distances)
+
+    @classmethod
+    def build_all_pairs(cls, adjacency, num_nodes):
+        distances = np.array([dijkstra_distances(adjacency, i, num_nodes) for i in range(num_nodes)]).reshape(num_nodes, num_nodes)
+        return cls(np.arange(num_nodes), distances, all_pairs=True)
+
+    @property
+    def num_nodes(self):
+        return self.distances.shape[1]
+
+    def _columns(self, adjacency, goal):
+        base = self.num_nodes
+        if not self.all_pairs:
+            if self._rows is None:
+                self._rows = np.ascontiguousarray(_finite(self.distances).T)
+            return len(self.landmarks), self._rows.__getitem__
+        if goal < base:
+            return 1, lambda ids: _finite(self.distances[goal, ids])[:, None]
+        edges = [(j, cost) for j, cost in adjacency[goal] if j < base]
+        if not edges:
+            return 0, lambda ids: np.empty((len(ids), 0))
+        via, costs = np.array(edges).T
+        via, costs = via.astype(np.int64), costs[:, None]
+        return 1, lambda ids: _finite((self.distances[np.ix_(via, ids)] + costs).min(axis=0))[:, None]
+
+    def heuristic(self, adjacency, goal, points=None):
+        # values are looked up only for the ids a search asks about; nodes added
+        # after the table was built (query endpoints) get their own row, set
+        # inside every neighbor's [d - c, d + c] so each landmark stays a valid bound
+        base = self.num_nodes
+        count, lookup = self._columns(adjacency, goal)
+        tail = np.zeros((len(adjacency) - base, count))
+
+        def gather(ids):
+            if ids.max() < base:
+                return lookup(ids)
+            old = ids < base
+            values = np.empty((len(ids), count))
+            values[old] = lookup(ids[old])
+            values[~old] = tail[ids[~old] - base]
+            return values
+
+        feasible = np.ones(count, dtype=bool)
+        pinned = goal if self.all_pairs else None
+        for i in range(base, len(adjacency)):
+            edges = [(j, cost) for j, cost in adjacency[i] if j < i]
+            if not edges:
+                continue
+            ids, costs = np.array(edges).T
+            values = gather(ids.astype(np.int64))
+            hi = (values + costs[:, None]).min(axis=0)
+            lo = (values - costs[:, None]).max(axis=0)
+            value = np.zeros(count) if i == pinned else hi
+            feasible &= (lo <= value + self.tolerance) & (value <= hi + self.tolerance)
+            tail[i - base] = value
+        goal_row = gather(np.array([goal]))[0]
+        if not feasible.all():
+            goal_row = goal_row[feasible]
+        tolerance = self.tolerance
+        goal_point = None if points is None else points[goal]
+
+        def h(ids):
+            if len(goal_row):
+                values = gather(np.asarray(ids, dtype=np.int64))
+                if len(goal_row) < count:
+                    values = values[:, feasible]
+                bounds = (np.abs(values - goal_row).max(axis=1) - tolerance).tolist()
+            else:
+                bounds = [0.0] * len(ids)
+            if goal_point is None:
+                return [max(bound, 0.0) for bound in bounds]
+            return [max(bound, math.dist(points[i], goal_point)) for bound, i in zip(bounds, ids)]
+
+        return h
+
+
+def _finite(values):
+    return np.where(np.isfinite(values), values, 0.0)
@@ -0,0 +1,140 @@
+import heapq
+import math
+
+INF = float('inf')
+
+
+class DStarLite:
+    def __init__(self, roadmap, start, goal):
+        self.roadmap = roadmap
+        self.stats = roadmap.stats
+        self.km = 0.0
+        self.g = {}
+        self.rhs = {}
+        self.open_list = []
+        self.open_keys = {}
+        self.temporary = []
+        # the goal goes in first so a temporary start is always the last node
+        # and can be dropped again when the start moves
+        self.goal = self._node_id(goal)
+        self.start = self._node_id(start)
+        self.last = self.start
+        self.rhs[self.goal] = 0.0
+        self._push(self.goal)
+        roadmap.listeners.append(self.notify)
+
+    def _node_id(self, node):
+        if isinstance(node, int):
+            return node
+        if self.roadmap.index is None:
+            self.roadmap.build()
+        node = self.roadmap.connect_query(node)
+        self._forget(node)
+        self.temporary.append(node)
+        return node
+
+    def _forget(self, u):
+        self.g.pop(u, None)
+        self.rhs.pop(u, None)
+        self.open_keys.pop(u, None)
+
+    def _release(self, u):
+        neighbors = [v for v, _ in self.roadmap.adjacency[u]]
+        for v in neighbors:
+            self.roadmap.remove_edge(u, v)
+        self.temporary.remove(u)
+        self._forget(u)
+        if u == len(self.roadmap.nodes) - 1:
+            self.roadmap.remove_last_nodes(1)
+        return neighbors
+
+    def h(self, a, b):
+        return math.dist(self.roadmap.nodes[a], self.roadmap.nodes[b])
+
+    def key(self, u):
+        m = min(self.g.get(u, INF), self.rhs.get(u, INF))
+        return (m + self.h(self.start, u) + self.km, m)
+
+    def _push(self, u):
+        key = self.key(u)
+        self.open_keys[u] = key
+        heapq.heappush(self.open_list, (key, u))
+
+    def update_vertex(self, u):
+        if u != self.goal:
+            self.rhs[u] = min((cost + self.g.get(v, INF) for v, cost in self.roadmap.adjacency[u]), default=INF)
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u)
+        else:
+            self.open_keys.pop(u, None)
+
+    def compute(self):
+        expanded = 0
+        with self.stats.stage('replan'):
+            while self.open_list:
+                k_old, u = self.open_list[0]
+                if self.open_keys.get(u) != k_old:
+                    heapq.heappop(self.open_list)
+                    continue
+                if not (k_old < self.key(self.start) or self.rhs.get(self.start, INF) != self.g.get(self.start, INF)):
+                    break
+                heapq.heappop(self.open_list)
+                k_new = self.key(u)
+                if k_old < k_new:
+                    self._push(u)
+                    continue
+                del self.open_keys[u]
+                expanded += 1
+                if self.g.get(u, INF) > self.rhs.get(u, INF):
+                    self.g[u] = self.rhs[u]
+                else:
+                    self.g[u] = INF
+                    self.update_vertex(u)
+                for v, _ in self.roadmap.adjacency[u]:
+                    self.update_vertex(v)
+            self.stats.count('nodes_expanded', expanded)
+
+    def path_ids(self):
+        self.compute()
+        if self.g.get(self.start, INF) == INF:
+            return []
+        path = [self.start]
+        visited = {self.start}
+        current = self.start
+        while current != self.goal:
+            current = min(self.roadmap.adjacency[current], key=lambda e: e[1] + self.g.get(e[0], INF))[0]
+            if current in visited:
+                return []
+            visited.add(current)
+            path.append(current)
+        return path
+
+    def plan(self):
+        path = self.path_ids()
+        while self.roadmap.lazy and path and not self.roadmap.validate_path(path):
+            self.stats.count('lazy_replans')
+            self.notify(path)
+            path = self.path_ids()
+        return [self.roadmap.nodes[i] for i in path]
+
+    def move_start(self, node):
+        previous = self.roadmap.nodes[self.last]
+        changed = []
+        if self.start in self.temporary and self.start != self.goal:
+            changed = self._release(self.start)
+        start = self._node_id(node)
+        self.km += math.dist(previous, self.roadmap.nodes[start])
+        self.last = self.start = start
+        changed += [start] + [v for v, _ in self.roadmap.adjacency[start]]
+        self.notify(changed)
+        return start
+
+    def notify(self, changed_nodes):
+        for u in changed_nodes:
+            self.update_vertex(u)
+
+    def close(self):
+        if self.notify in self.roadmap.listeners:
+            self.roadmap.listeners.remove(self.notify)
+        for u in sorted(self.temporary, reverse=True):
+            self._release(u)
@@ -0,0 +1,196 @@
+import heapq
+import math
+import numpy as np
+from .batch import shortest_path_tree
+
+INF = float('inf')
+
+
+class ReservationTable:
+    # agents are points that must stay more than radius apart at every integer
+    # step, including the in-between steps of edges that take several
+    def __init__(self, radius=0.0):
+        self.radius = radius
+        self.positions = {}
+        self.edges = {}
+        self.parked = {}
+        self.horizon = -1
+        self.reserved = 0
+
+    def clear(self, point, t, agent=None):
+        for other, (since, parked_at) in self.parked.items():
+            if other != agent and t >= since and math.dist(point, parked_at) <= self.radius:
+                return False
+        for other, position in self.positions.get(t, ()):
+            if other != agent and math.dist(point, position) <= self.radius:
+                return False
+        return True
+
+    def edge_free(self, a, b, t, duration, agent=None):
+        key = (a, b) if a < b else (b, a)
+        for s in range(t, t + duration):
+            owner = self.edges.get((key, s))
+            if owner is not None and owner != agent:
+                return False
+        return True
+
+    def can_park(self, point, t, agent=None):
+        for other, (_, parked_at) in self.parked.items():
+            if other != agent and math.dist(point, parked_at) <= self.radius:
+                return False
+        return all(self.clear(point, s, agent) for s in range(t, self.horizon + 1))
+
+    def occupy(self, point, t, agent):
+        self.positions.setdefault(t, []).append((agent, point))
+        self.horizon = max(self.horizon, t)
+
+    def park(self, point, t, agent):
+        self.occupy(point, t, agent)
+        self.parked[agent] = (t, point)
+
+    def reserve(self, agent, timed_points):
+        for (u, a, t), (v, b, arrival) in zip(timed_points, timed_points[1:]):
+            for s in range(t, arrival):
+                self.occupy(lerp(a, b, (s - t) / (arrival - t)), s, agent)
+            if u != v:
+                key = (u, v) if u < v else (v, u)
+                for s in range(t, arrival):
+                    self.edges[(key, s)] = agent
+        _, point, t = timed_points[-1]
+        self.park(point, t, agent)
+        self.reserved += 1
+
+
+class MultiAgentPlanner:
+    # prioritized planning: agents are searched one at a time in space-time,
+    # each keeping clear of the agents planned before it and of the starts of
+    # the agents still waiting for a plan
+    def __init__(self, roadmap, radius=0.0, step=None, max_time=None):
+        self.roadmap = roadmap
+        self.stats = roadmap.stats
+        self.radius = radius
+        self.step = step
+        self.max_time = max_time
+
+    def duration(self, cost):
+        return max(1, math.ceil(cost / self.step - 1e-9))
+
+    def plan(self, starts, goals, order=None, return_stats=False):
+        roadmap = self.roadmap
+        if roadmap.index is None:
+            roadmap.build()
+        starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+        goals = np.asarray(goals, dtype=float).reshape(-1, 2)
+        num_nodes = len(roadmap.nodes)
+        mark = roadmap.components.checkpoint()
+        try:
+            # endpoints sitting on a roadmap node use it directly and equal points
+            # share one temporary node, so step 1 of a plan never spends a whole
+            # step on a zero-length connector
+            endpoints = np.vstack([starts, goals])
+            ids = [roadmap.snap(point) for point in endpoints.tolist()]
+            loose = list(dict.fromkeys(node for node in ids if not isinstance(node, int)))
+            if loose:
+                connected = dict(zip(loose, roadmap.connect_queries(loose)))
+                ids = [connected.get(node, node) for node in ids]
+            start_ids, goal_ids = ids[:len(starts)], ids[len(starts):]
+            if self.step is None:
+                costs = [cost for edges in roadmap.adjacency for _, cost in edges]
+                self.step = float(np.median(costs)) if costs else 1.0
+            order = list(order if order is not None else range(len(starts)))
+            trees = {}
+            with self.stats.stage('multiagent'):
+                # every pass is collision-free; moving the agents that found no
+                # plan to the front only looks for an order where fewer fail
+                best = None
+                for _ in range(len(order)):
+                    results = self.prioritized(order, start_ids, goal_ids, trees)
+                    failed = [agent for agent in order if not results[agent]['path']]
+                    if best is not None and len(failed) >= best[0]:
+                        break
+                    best = (len(failed), results)
+                    if failed == order[:len(failed)]:
+                        break
+                    self.stats.count('priority_swaps')
+                    order = failed + [agent for agent in order if agent not in failed]
+                failures, results = best
+                self.stats.count('agents_failed', failures)
+        finally:
+            roadmap.remove_last_nodes(len(roadmap.nodes) - num_nodes)
+            roadmap.components.rollback(mark)
+        paths = [result.pop('path') for result in results]
+        return (paths, results) if return_stats else paths
+
+    def prioritized(self, order, start_ids, goal_ids, trees):
+        points = self.roadmap.nodes
+        # agents not planned yet, and those that find no plan, stay at their start
+        table = ReservationTable(self.radius)
+        for agent, start in enumerate(start_ids):
+            table.park(points[start], 0, agent)
+        results = [None] * len(start_ids)
+        for agent in order:
+            goal = goal_ids[agent]
+            if goal not in trees:
+                trees[goal] = shortest_path_tree(self.roadmap.adjacency, goal)[0]
+            timed, expanded = self.search(agent, start_ids[agent], goal, trees[goal], table)
+            self.stats.count('nodes_expanded', expanded)
+            if timed is None:
+                results[agent] = {'path': [], 'arrival': INF, 'expanded': expanded}
+                continue
+            table.reserve(agent, [(node, points[node], t) for node, t in timed])
+            path = [(*points[node], t) for node, t in timed]
+            results[agent] = {'path': path, 'arrival': timed[-1][1], 'expanded': expanded}
+        return results
+
+    def search(self, agent, start, goal, dist, table):
+        if start not in dist:
+            return None, 0
+        adjacency = self.roadmap.adjacency
+        points = self.roadmap.nodes
+        max_time = self.max_time
+        if max_time is None:
+            max_time = 2 * math.ceil(dist[start] / self.step) + 4 * table.reserved + 32
+        open_list = [(dist[start] / self.step, 0, start)]
+        parent = {(start, 0): None}
+        closed = set()
+        while open_list:
+            _, t, u = heapq.heappop(open_list)
+            if (u, t) in closed:
+                continue
+            closed.add((u, t))
+            if u == goal and table.can_park(points[goal], t, agent):
+                timed = [(u, t)]
+                while parent[timed[-1]] is not None:
+                    timed.append(parent[timed[-1]])
+                return timed[::-1], len(closed)
+            moves = [(u, 1)] + [(v, self.duration(cost)) for v, cost in adjacency[u] if v in dist]
+            for v, d in moves:
+                arrival = t + d
+                if arrival > max_time or (v, arrival) in parent:
+                    continue
+                if v != u and not table.edge_free(u, v, t, d, agent):
+                    continue
+                if not all(table.clear(lerp(points[u], points[v], s / d), t + s, agent) for s in range(1, d + 1)):
+                    continue
+                parent[(v, arrival)] = (u, t)
+                heapq.heappush(open_list, (arrival + dist[v] / self.step, arrival, v))
+        return None, len(closed)
+
+
+def lerp(a, b, f):
+    if f >= 1:
+        return b
+    return (a[0] + f * (b[0] - a[0]), a[1] + f * (b[1] - a[1]))
+
+
+def position_at(path, t):
+    if not path:
+        return None
+    if t <= path[0][2]:
+        return path[0][:2]
+    for (x0, y0, t0), (x1, y1, t1) in zip(path, path[1:]):
+        if t <= t1:
+            f = (t - t0) / (t1 - t0)
+            return (x0 + f * (x1 - x0), y0 + f * (y1 - y0))
+    return path[-1][:2]
+
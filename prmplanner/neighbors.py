@@ -0,0 +1,284 @@
+import numpy as np
+from .stats import NULL_STATS
+
+
+class SpatialIndex:
+    ARRAYS = ()
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.points)
+
+    def to_arrays(self):
+        return {name: np.asarray(getattr(self, name)) for name in self.ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, points, arrays):
+        # rebuilds an index from to_arrays() output without partitioning again
+        index = cls.__new__(cls)
+        SpatialIndex.__init__(index, points)
+        for name in cls.ARRAYS:
+            setattr(index, name, arrays[name])
+        index._finish()
+        return index
+
+    def _finish(self):
+        pass
+
+    def query(self, queries, k):
+        queries = np.asarray(queries, dtype=float).reshape(-1, 2)
+        m = len(queries)
+        dist = np.full((m, k), np.inf)
+        idx = np.full((m, k), -1, dtype=np.int64)
+        n = len(self.points)
+        if m == 0 or k <= 0 or n == 0:
+            return dist, idx
+        kk = min(k, n)
+        for group in self._groups(queries):
+            q = queries[group]
+            lo, hi = q.min(axis=0), q.max(axis=0)
+            radius = 0.0
+            candidates = self._candidates(lo, hi, self._bucket_of(q[:1])[0])
+            while len(candidates) < kk:
+                radius = self._grow(radius)
+                candidates = self._candidates(lo - radius, hi + radius)
+            d = self._distances(q, candidates)
+            bound = np.partition(d, kk - 1, axis=1)[:, kk - 1].max()
+            if bound > radius:
+                candidates = self._candidates(lo - bound, hi + bound)
+                d = self._distances(q, candidates)
+            part = np.argpartition(d, kk - 1, axis=1)[:, :kk]
+            part_d = np.take_along_axis(d, part, axis=1)
+            order = np.argsort(part_d, axis=1, kind='stable')
+            dist[group, :kk] = np.take_along_axis(part_d, order, axis=1)
+            idx[group, :kk] = candidates[np.take_along_axis(part, order, axis=1)]
+        return dist, idx
+
+    def query_radius(self, queries, r):
+        queries = np.asarray(queries, dtype=float).reshape(-1, 2)
+        result = [None] * len(queries)
+        for group in self._groups(queries):
+            q = queries[group]
+            candidates = self._candidates(q.min(axis=0) - r, q.max(axis=0) + r)
+            d = self._distances(q, candidates)
+            for row, i in enumerate(group):
+                inside = np.flatnonzero(d[row] <= r)
+                result[i] = candidates[inside[np.argsort(d[row, inside], kind='stable')]]
+        return result
+
+    def query_box(self, lo, hi):
+        candidates = self._candidates(np.asarray(lo, dtype=float), np.asarray(hi, dtype=float))
+        pts = self.points[candidates]
+        inside = ((pts >= lo) & (pts <= hi)).all(axis=1)
+        return np.sort(candidates[inside])
+
+    def _distances(self, queries, candidates):
+        diff = queries[:, None, :] - self.points[candidates][None, :, :]
+        return np.sqrt((diff ** 2).sum(axis=2))
+
+    def _groups(self, queries):
+        buckets = self._bucket_of(queries)
+        order = np.argsort(buckets, kind='stable')
+        splits = np.flatnonzero(np.diff(buckets[order])) + 1
+        return np.split(order, splits)
+
+
+class KDTree(SpatialIndex):
+    ARRAYS = ('order', 'lo', 'hi', 'start', 'end', 'left', 'right', 'split_dim', 'split_val')
+
+    def __init__(self, points, leaf_size=16):
+        super().__init__(points)
+        self.leaf_size = max(1, int(leaf_size))
+        self.order = np.arange(len(self.points))
+        self.lo, self.hi = [], []
+        self.start, self.end = [], []
+        self.left, self.right = [], []
+        self.split_dim, self.split_val = [], []
+        self._build(0, len(self.points))
+        self._finish()
+
+    def _finish(self):
+        self.lo = np.asarray(self.lo, dtype=float).reshape(-1, 2)
+        self.hi = np.asarray(self.hi, dtype=float).reshape(-1, 2)
+        self.start = np.asarray(self.start).tolist()
+        self.end = np.asarray(self.end).tolist()
+        self.left = np.asarray(self.left)
+        self.right = np.asarray(self.right)
+        self.split_dim = np.asarray(self.split_dim)
+        self.split_val = np.asarray(self.split_val)
+        self.boxes = np.hstack([self.lo, self.hi]).tolist()
+        self.children = [None if l < 0 else (l, r) for l, r in zip(self.left.tolist(), self.right.tolist())]
+        extent = self.hi[0] - self.lo[0] if len(self.points) else np.zeros(2)
+        self.scale = max(float(extent.max()) / max(len(self.points), 1) ** 0.5, 1e-9)
+
+    def _build(self, start, end):
+        node = len(self.start)
+        pts = self.points[self.order[start:end]]
+        self.lo.append(pts.min(axis=0) if end > start else np.zeros(2))
+        self.hi.append(pts.max(axis=0) if end > start else np.zeros(2))
+        self.start.append(start)
+        self.end.append(end)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.split_dim.append(0)
+        self.split_val.append(0.0)
+        if end - start <= self.leaf_size:
+            return node
+        dim = int(np.argmax(self.hi[node] - self.lo[node]))
+        mid = (end - start) // 2
+        part = np.argpartition(pts[:, dim], mid)
+        self.order[start:end] = self.order[start:end][part]
+        self.split_dim[node] = dim
+        self.split_val[node] = self.points[self.order[start + mid], dim]
+        self.left[node] = self._build(start, start + mid)
+        self.right[node] = self._build(start + mid, end)
+        return node
+
+    def _bucket_of(self, queries):
+        node = np.zeros(len(queries), dtype=np.int64)
+        inner = self.left[node] >= 0
+        while inner.any():
+            cur = node[inner]
+            go_left = queries[inner, self.split_dim[cur]] < self.split_val[cur]
+            node[inner] = np.where(go_left, self.left[cur], self.right[cur])
+            inner = self.left[node] >= 0
+        return node
+
+    def _candidates(self, lo, hi, leaf=None):
+        if leaf is not None and self.end[leaf] > self.start[leaf]:
+            return self.order[self.start[leaf]:self.end[leaf]]
+        lx, ly = float(lo[0]), float(lo[1])
+        hx, hy = float(hi[0]), float(hi[1])
+        slices = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            nlx, nly, nhx, nhy = self.boxes[node]
+            if nlx > hx or nly > hy or nhx < lx or nhy < ly:
+                continue
+            if self.children[node] is None:
+                slices.append(self.order[self.start[node]:self.end[node]])
+            else:
+                stack.extend(self.children[node])
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(slices)
+
+    def _grow(self, radius):
+        return radius * 2 if radius > 0 else self.scale
+
+
+class GridIndex(SpatialIndex):
+    ARRAYS = ('origin', 'cell_size', 'shape', 'order', 'cell_start')
+
+    def __init__(self, points, bucket_size=8, cell_size=None):
+        super().__init__(points)
+        n = len(self.points)
+        self.origin = self.points.min(axis=0) if n else np.zeros(2)
+        extent = (self.points.max(axis=0) - self.origin) if n else np.ones(2)
+        if cell_size is None:
+            area = max(float(extent[0]) * float(extent[1]), 1e-9)
+            cell_size = (area * bucket_size / max(n, 1)) ** 0.5
+        self.cell_size = max(float(cell_size), 1e-9)
+        self.shape = (np.floor(extent / self.cell_size).astype(int) + 1)
+        cells = self._cell_ids(self.points)
+        self.order = np.argsort(cells, kind='stable')
+        self.cell_start = np.searchsorted(cells[self.order], np.arange(self.shape[0] * self.shape[1] + 1))
+
+    def _finish(self):
+        self.cell_size = float(self.cell_size)
+        self.shape = np.asarray(self.shape)
+
+    def _cell_coords(self, points):
+        ij = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(ij, 0, self.shape - 1)
+
+    def _cell_ids(self, points):
+        ij = self._cell_coords(points)
+        return ij[:, 0] * self.shape[1] + ij[:, 1]
+
+    def _bucket_of(self, queries):
+        return self._cell_ids(queries)
+
+    def _candidates(self, lo, hi, bucket=None):
+        (i0, j0), (i1, j1) = self._cell_coords(np.array([lo, hi]))
+        slices = []
+        for i in range(i0, i1 + 1):
+            first = self.cell_start[i * self.shape[1] + j0]
+            last = self.cell_start[i * self.shape[1] + j1 + 1]
+            if last > first:
+                slices.append(self.order[first:last])
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(slices)
+
+    def _grow(self, radius):
+        return radius + self.cell_size
+
+
+NEIGHBOR_METHODS = {'kdtree': KDTree, 'grid': GridIndex}
+
+
+def build_index(points, method='kdtree'):
+    if method not in NEIGHBOR_METHODS:
+        raise ValueError(f"Unknown neighbor method '{method}', expected one of {sorted(NEIGHBOR_METHODS)}")
+    return NEIGHBOR_METHODS[method](points)
+
+
+def restore_index(points, arrays, method='kdtree'):
+    if method not in NEIGHBOR_METHODS:
+        raise ValueError(f"Unknown neighbor method '{method}', expected one of {sorted(NEIGHBOR_METHODS)}")
+    return NEIGHBOR_METHODS[method].from_arrays(points, arrays)
+
+
+def k_nearest(points, k, method='kdtree', index=None):
+    if index is None:
+        index = build_index(points, method)
+    points = index.points
+    n = len(points)
+    k = max(0, min(k, n - 1))
+    dist, idx = index.query(points, k + 1)
+    is_self = idx == np.arange(n)[:, None]
+    missing = ~is_self.any(axis=1)
+    is_self[missing, -1] = True
+    dist = dist[~is_self].reshape(n, k)
+    idx = idx[~is_self].reshape(n, k)
+    return dist, idx
+
+
+def knn_edges(index, k, checker=None, candidates=None, start=0, stop=None, stats=NULL_STATS):
+    points = index.points
+    stop = len(points) if stop is None else stop
+    candidates = k if candidates is None else max(candidates, k)
+    ids = np.arange(start, stop)
+    with stats.stage('neighbors'):
+        _, neighbors = index.query(points[start:stop], candidates + 1)
+    connected = np.zeros(len(ids), dtype=np.int64)
+    edge_rows, edge_cols = [], []
+    for lo in range(0, neighbors.shape[1], k):
+        block = neighbors[:, lo:lo + k]
+        local = np.repeat(np.arange(len(ids)), block.shape[1])
+        cols = block.ravel()
+        active = (cols >= 0) & (connected[local] < k)
+        local, cols = local[active], cols[active]
+        active = (points[ids[local]] != points[cols]).any(axis=1)
+        local, cols = local[active], cols[active]
+        if len(local) == 0:
+            break
+        if checker is not None:
+            stats.count('collision_checks', len(local))
+            with stats.stage('collision'):
+                free = ~checker.segments_in_obstacle(points[ids[local]], points[cols])
+            local, cols = local[free], cols[free]
+        rank = np.arange(len(local)) - np.searchsorted(local, local) + connected[local]
+        local, cols = local[rank < k], cols[rank < k]
+        np.add.at(connected, local, 1)
+        edge_rows.append(ids[local])
+        edge_cols.append(cols)
+    if not edge_rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    rows, cols = np.concatenate(edge_rows), np.concatenate(edge_cols)
+    order = np.lexsort((cols, rows))
+    return rows[order], cols[order]
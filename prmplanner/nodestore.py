@@ -0,0 +1,141 @@
+import heapq
+import math
+import numpy as np
+from .storage import RoadmapArrays
+from .components import component_labels
+
+
+class Node:
+    __slots__ = ('store', 'id')
+
+    def __init__(self, store, id):
+        self.store = store
+        self.id = id
+
+    @property
+    def x(self):
+        return float(self.store.points[self.id, 0])
+
+    @property
+    def y(self):
+        return float(self.store.points[self.id, 1])
+
+    @property
+    def edges(self):
+        indices, _ = self.store.neighbors(self.id)
+        return [Node(self.store, j) for j in indices.tolist()]
+
+    def __lt__(self, other):
+        return self.id < other.id
+
+    def __hash__(self):
+        return self.id
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and self.store is other.store and self.id == other.id
+
+    def __repr__(self):
+        return f'Node({self.x}, {self.y})'
+
+
+class NodeStore(RoadmapArrays):
+    @classmethod
+    def from_points(cls, points):
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        return cls(points, np.zeros(len(points) + 1, dtype=np.int64), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32))
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays.points, arrays.indptr, arrays.indices, arrays.weights, arrays.meta)
+
+    def to_arrays(self):
+        rows, cols, costs = self.edge_pairs()
+        keep = np.isfinite(costs)
+        return RoadmapArrays.from_edges(self.points, rows[keep], cols[keep], costs[keep])
+
+    def set_edges(self, rows, cols, costs=None):
+        arrays = RoadmapArrays.from_edges(self.points, rows, cols, costs)
+        self.indptr, self.indices, self.weights = arrays.indptr, arrays.indices, arrays.weights
+        self._scores = None
+        self._labels = None
+
+    def __len__(self):
+        return self.num_nodes
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.num_nodes
+        if not 0 <= i < self.num_nodes:
+            raise IndexError('node index out of range')
+        return Node(self, i)
+
+    def __iter__(self):
+        return (Node(self, i) for i in range(self.num_nodes))
+
+    def neighbors(self, i):
+        indices, weights = super().neighbors(i)
+        alive = np.isfinite(weights)
+        return indices[alive], weights[alive]
+
+    def component_labels(self):
+        if getattr(self, '_labels', None) is None:
+            rows, cols, _ = self.edge_pairs()
+            self._labels = component_labels(self.num_nodes, rows, cols)
+        return self._labels
+
+    def connected(self, i, j):
+        labels = self.component_labels()
+        return labels[i] == labels[j]
+
+    def remove_edge(self, i, j):
+        if not self.weights.flags.writeable:
+            self.weights = np.array(self.weights)
+        for a, b in ((i, j), (j, i)):
+            lo, hi = self.indptr[a], self.indptr[a + 1]
+            self.weights[lo:hi][self.indices[lo:hi] == b] = np.inf
+
+    def _score_arrays(self):
+        if getattr(self, '_scores', None) is None or len(self._scores[0]) != self.num_nodes:
+            self._scores = np.full(self.num_nodes, np.inf), np.full(self.num_nodes, -1, dtype=np.int64)
+        return self._scores
+
+    def shortest_path(self, start, goal):
+        if not self.connected(start, goal):
+            return [], 0
+        g_score, came_from = self._score_arrays()
+        points = self.points
+        indptr = self.indptr
+        gx, gy = float(points[goal, 0]), float(points[goal, 1])
+        touched = [start]
+        g_score[start] = 0.0
+        open_list = [(0.0, start)]
+        closed = set()
+        path = []
+        try:
+            while open_list:
+                _, current = heapq.heappop(open_list)
+                if current == goal:
+                    path = [current]
+                    while current != start:
+                        current = int(came_from[current])
+                        path.append(current)
+                    path.reverse()
+                    break
+                if current in closed:
+                    continue
+                closed.add(current)
+                base = g_score[current]
+                lo, hi = indptr[current], indptr[current + 1]
+                for neighbor, cost in zip(self.indices[lo:hi].tolist(), self.weights[lo:hi].tolist()):
+                    tentative_g_score = base + cost
+                    if tentative_g_score < g_score[neighbor]:
+                        if g_score[neighbor] == np.inf:
+                            touched.append(neighbor)
+                        came_from[neighbor] = current
+                        g_score[neighbor] = tentative_g_score
+                        x, y = points[neighbor].tolist()
+                        heapq.heappush(open_list, (tentative_g_score + math.hypot(x - gx, y - gy), neighbor))
+        finally:
+            g_score[touched] = np.inf
+            came_from[touched] = -1
+        return path, len(closed)
@@ -0,0 +1,110 @@
+import hashlib
+import math
+import os
+import numpy as np
+
+CACHE_DIR = '.prm_cache'
+
+
+def load_obstacle_map(image_path):
+    from PIL import Image
+    return np.array(Image.open(image_path).convert('L'))
+
+
+def distance_to_obstacles(occupied, max_distance=64):
+    occupied = np.asarray(occupied, dtype=bool)
+    height, width = occupied.shape
+    cap = float(max_distance + 1)
+    rows = np.arange(height, dtype=np.float32)[:, None]
+    above = np.maximum.accumulate(np.where(occupied, rows, -np.inf), axis=0)
+    below = np.minimum.accumulate(np.where(occupied, rows, np.inf)[::-1], axis=0)[::-1]
+    column = np.minimum(np.minimum(rows - above, below - rows), cap).astype(np.float32)
+    column_sq = column ** 2
+    dist_sq = column_sq.copy()
+    for dx in range(1, min(int(max_distance), width - 1) + 1):
+        shifted = column_sq + np.float32(dx * dx)
+        np.minimum(dist_sq[:, dx:], shifted[:, :-dx], out=dist_sq[:, dx:])
+        np.minimum(dist_sq[:, :-dx], shifted[:, dx:], out=dist_sq[:, :-dx])
+    return np.minimum(np.sqrt(dist_sq), np.float32(max_distance))
+
+
+def inflate_obstacles(obstacle_map, robot_radius=5, max_clearance=64, threshold=0):
+    occupied = np.asarray(obstacle_map) <= threshold
+    clearance = distance_to_obstacles(occupied, max(max_clearance, robot_radius + 1))
+    inflated_map = np.where(clearance <= robot_radius, 0, 255).astype(np.uint8)
+    return inflated_map, clearance
+
+
+def apply_patch(occupancy_map, obstacle_map, x, y, patch, robot_radius=0, threshold=0):
+    # the patch holds obstacle-map values; it is clipped to the map, and every
+    # inflated pixel within robot_radius of it is recomputed. returns the box of
+    # pixels that may have changed, or None when the patch misses the map
+    patch = np.asarray(patch)
+    height, width = occupancy_map.shape[:2]
+    x, y = int(x), int(y)
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + patch.shape[1], width), min(y + patch.shape[0], height)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    patch = patch[y0 - y:y1 - y, x0 - x:x1 - x]
+    if obstacle_map is None:
+        if robot_radius > 0:
+            raise ValueError('inflating a patch needs the obstacle map the occupancy map was built from')
+        occupancy_map[y0:y1, x0:x1] = np.where(patch <= threshold, 0, 255)
+        return (x0, y0, x1, y1)
+    obstacle_map[y0:y1, x0:x1] = patch
+    reach = int(math.ceil(robot_radius))
+    bx0, by0 = max(x0 - reach, 0), max(y0 - reach, 0)
+    bx1, by1 = min(x1 + reach, width), min(y1 + reach, height)
+    # only obstacles within reach of the box decide its pixels
+    wx0, wy0 = max(bx0 - reach - 1, 0), max(by0 - reach - 1, 0)
+    wx1, wy1 = min(bx1 + reach + 1, width), min(by1 + reach + 1, height)
+    inflated, _ = inflate_obstacles(obstacle_map[wy0:wy1, wx0:wx1], robot_radius, reach + 1, threshold)
+    occupancy_map[by0:by1, bx0:bx1] = inflated[by0 - wy0:by1 - wy0, bx0 - wx0:bx1 - wx0]
+    return (bx0, by0, bx1, by1)
+
+
+def image_hash(image_path):
+    with open(image_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_inflated_map(image_path, robot_radius=5, max_clearance=64, threshold=0, cache_dir=CACHE_DIR):
+    obstacle_map = load_obstacle_map(image_path)
+    cache_path = None
+    if cache_dir is not None:
+        key = f'{image_hash(image_path)}_r{robot_radius}_c{max_clearance}_t{threshold}'
+        cache_path = os.path.join(cache_dir, f'inflated_{key}.npz')
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                return obstacle_map, cached['inflated_map'], cached['clearance']
+    inflated_map, clearance = inflate_obstacles(obstacle_map, robot_radius, max_clearance, threshold)
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + f'.{os.getpid()}.tmp.npz'
+        np.savez(tmp_path, inflated_map=inflated_map, clearance=clearance)
+        os.replace(tmp_path, cache_path)
+    return obstacle_map, inflated_map, clearance
+
+
+def load_pyramid(image_path, robot_radius=5, max_clearance=64, threshold=0, levels=6, cache_dir=CACHE_DIR, mmap=True):
+    from .pyramid import OccupancyPyramid
+    if cache_dir is not None:
+        key = f'{image_hash(image_path)}_r{robot_radius}_c{max_clearance}_t{threshold}_l{levels}'
+        cache_path = os.path.join(cache_dir, f'pyramid_{key}')
+        pyramid = OccupancyPyramid.load(cache_path, mmap)
+        if pyramid is not None:
+            # without the obstacle map, update() refuses patches instead of
+            # writing them uninflated
+            pyramid.robot_radius, pyramid.threshold = robot_radius, threshold
+            return pyramid
+    obstacle_map, inflated_map, _ = load_inflated_map(image_path, robot_radius, max_clearance, threshold, cache_dir)
+    pyramid = OccupancyPyramid(inflated_map, levels, obstacle_map=obstacle_map, robot_radius=robot_radius, threshold=threshold)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        pyramid.save(cache_path)
+        if mmap:
+            loaded = OccupancyPyramid.load(cache_path, mmap)
+            loaded.obstacle_map, loaded.robot_radius, loaded.threshold = obstacle_map, robot_radius, threshold
+            return loaded
+    return pyramid
@@ -0,0 +1,100 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from .neighbors import build_index, knn_edges, restore_index
+from .stats import NULL_STATS, PlannerStats
+
+_worker = {}
+
+
+def share_array(array):
+    # ascontiguousarray turns scalars into 1-element arrays; keep their shape
+    array = np.ascontiguousarray(array).reshape(np.shape(array))
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def attach_array(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def share_object(obj, segments):
+    shared = {}
+    for name, value in vars(obj).items():
+        if isinstance(value, np.ndarray):
+            shm, spec = share_array(value)
+            segments.append(shm)
+            value = ('__shared__', spec)
+        shared[name] = value
+    return type(obj), shared
+
+
+def attach_object(exported, segments):
+    cls, shared = exported
+    obj = cls.__new__(cls)
+    for name, value in shared.items():
+        if isinstance(value, tuple) and len(value) == 2 and value[0] == '__shared__':
+            shm, value = attach_array(value[1])
+            segments.append(shm)
+        setattr(obj, name, value)
+    return obj
+
+
+def _init_worker(points_spec, index_specs, checker, neighbor_method):
+    segments = []
+    shm, points = attach_array(points_spec)
+    segments.append(shm)
+    arrays = {}
+    for name, spec in index_specs.items():
+        shm, arrays[name] = attach_array(spec)
+        segments.append(shm)
+    _worker['segments'] = segments
+    _worker['index'] = restore_index(points, arrays, neighbor_method)
+    _worker['checker'] = attach_object(checker, segments) if checker is not None else None
+
+
+def _connect_shard(args):
+    start, stop, k, candidates = args
+    stats = PlannerStats()
+    rows, cols = knn_edges(_worker['index'], k, _worker['checker'], candidates, start, stop, stats)
+    return rows, cols, stats.counters
+
+
+def parallel_knn_edges(points, k, checker=None, candidates=None, neighbor_method='kdtree', workers=None, shard_size=None, stats=NULL_STATS, index=None):
+    # the index is built once here and its arrays are shared with the workers
+    # like the obstacle arrays, so no worker partitions the points again
+    if index is None:
+        with stats.stage('index'):
+            index = build_index(points, neighbor_method)
+    points = index.points
+    workers = workers or os.cpu_count() or 1
+    n = len(points)
+    if shard_size is None:
+        shard_size = max(1024, -(-n // (workers * 4)))
+    shards = [(lo, min(lo + shard_size, n), k, candidates) for lo in range(0, n, shard_size)]
+    segments = []
+    try:
+        shm, points_spec = share_array(points)
+        segments.append(shm)
+        index_specs = {}
+        for name, array in index.to_arrays().items():
+            shm, index_specs[name] = share_array(array)
+            segments.append(shm)
+        exported = share_object(checker, segments) if checker is not None else None
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(points_spec, index_specs, exported, neighbor_method)) as pool:
+            results = list(pool.map(_connect_shard, shards))
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    if not results:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    for _, _, counters in results:
+        stats.merge(counters)
+    rows = np.concatenate([rows for rows, _, _ in results])
+    cols = np.concatenate([cols for _, cols, _ in results])
+    return rows, cols
@@ -0,0 +1,159 @@
+import json
+import os
+import shutil
+import numpy as np
+from .occupancy import apply_patch
+from .storage import array_hash
+
+FORMAT_VERSION = 1
+
+
+def max_pool(blocked, factor):
+    height, width = blocked.shape
+    padded = np.zeros((-(-height // factor) * factor, -(-width // factor) * factor), dtype=bool)
+    padded[:height, :width] = blocked
+    return padded.reshape(padded.shape[0] // factor, factor, padded.shape[1] // factor, factor).any(axis=(1, 3))
+
+
+def dilate(blocked):
+    padded = np.pad(blocked, 1)
+    height, width = blocked.shape
+    out = np.zeros_like(blocked)
+    for dy in range(3):
+        for dx in range(3):
+            out |= padded[dy:dy + height, dx:dx + width]
+    return out
+
+
+class OccupancyPyramid:
+    # level L stores, per 2**L block, whether that block or any of its 8
+    # neighbours holds an obstacle, so a sample landing in a clear block
+    # proves every pixel within one block of it is free
+    def __init__(self, occupancy_map, levels=6, pyramid=None, fingerprint=None, obstacle_map=None, robot_radius=0, threshold=0):
+        self.occupancy_map = occupancy_map
+        self.levels = levels
+        self.obstacle_map = obstacle_map
+        self.robot_radius = robot_radius
+        self.threshold = threshold
+        if pyramid is None:
+            blocked = np.asarray(occupancy_map) == 0
+            pyramid = [dilate(max_pool(blocked, 1 << level)) for level in range(1, levels + 1)]
+        self.pyramid = list(pyramid)
+        self._fingerprint = fingerprint
+
+    @property
+    def map_size(self):
+        return (self.occupancy_map.shape[1], self.occupancy_map.shape[0])
+
+    def fingerprint(self):
+        if self._fingerprint is None:
+            self._fingerprint = array_hash(self.occupancy_map)
+        return self._fingerprint
+
+    def update(self, x, y, patch):
+        if not self.occupancy_map.flags.writeable:
+            self.occupancy_map = np.array(self.occupancy_map)
+        if self.obstacle_map is not None and not self.obstacle_map.flags.writeable:
+            self.obstacle_map = np.array(self.obstacle_map)
+        box = apply_patch(self.occupancy_map, self.obstacle_map, x, y, patch, self.robot_radius, self.threshold)
+        if box is None:
+            return None
+        bx0, by0, bx1, by1 = box
+        blocked = self.occupancy_map == 0
+        for level in range(1, self.levels + 1):
+            size = 1 << level
+            x0, y0 = max(bx0 // size - 1, 0), max(by0 // size - 1, 0)
+            x1, y1 = (bx1 - 1) // size + 2, (by1 - 1) // size + 2
+            rows, cols = self.pyramid[level - 1].shape
+            x1, y1 = min(x1, cols), min(y1, rows)
+            px0, py0 = max(x0 - 1, 0) * size, max(y0 - 1, 0) * size
+            region = max_pool(blocked[py0:(y1 + 1) * size, px0:(x1 + 1) * size], size)
+            grown = dilate(region)
+            if not self.pyramid[level - 1].flags.writeable:
+                self.pyramid[level - 1] = np.array(self.pyramid[level - 1])
+            oy, ox = y0 - py0 // size, x0 - px0 // size
+            self.pyramid[level - 1][y0:y1, x0:x1] = grown[oy:oy + y1 - y0, ox:ox + x1 - x0]
+        self._fingerprint = None
+        return box
+
+    def points_in_obstacle(self, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        height, width = self.occupancy_map.shape[:2]
+        x = np.clip(points[:, 0].astype(np.int64), 0, width - 1)
+        y = np.clip(points[:, 1].astype(np.int64), 0, height - 1)
+        hit = np.zeros(len(points), dtype=bool)
+        coarse = self.pyramid[0][y >> 1, x >> 1] if self.levels else np.ones(len(points), dtype=bool)
+        hit[coarse] = self.occupancy_map[y[coarse], x[coarse]] == 0
+        return hit
+
+    def segments_in_obstacle(self, starts, ends):
+        starts = np.asarray(starts, dtype=float).reshape(-1, 2).astype(np.int64)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 2).astype(np.int64)
+        height, width = self.occupancy_map.shape[:2]
+        counts = np.abs(ends - starts).max(axis=1) + 1
+        hit = np.zeros(len(starts), dtype=bool)
+        seg = np.arange(len(starts))
+        lo = np.zeros(len(starts), dtype=np.int64)
+        hi = counts.copy()
+        for level in range(self.levels, 0, -1):
+            if not len(seg):
+                break
+            size = 1 << level
+            chunks = -(-(hi - lo) // size)
+            owner = np.repeat(np.arange(len(seg)), chunks)
+            first = np.repeat(np.cumsum(chunks) - chunks, chunks)
+            a = lo[owner] + (np.arange(len(owner)) - first) * size
+            b = np.minimum(a + size, hi[owner])
+            middle = (a + b - 1) // 2
+            s = seg[owner]
+            n = counts[s]
+            t = middle / np.maximum(n - 1, 1)
+            d = ends[s] - starts[s]
+            x = np.clip(np.rint(starts[s, 0] + t * d[:, 0]).astype(np.int64), 0, width - 1)
+            y = np.clip(np.rint(starts[s, 1] + t * d[:, 1]).astype(np.int64), 0, height - 1)
+            near = self.pyramid[level - 1][y >> level, x >> level]
+            if near.any():
+                blocked = np.zeros(len(near), dtype=bool)
+                blocked[near] = self.occupancy_map[y[near], x[near]] == 0
+                hit[s[blocked]] = True
+            keep = near & ~hit[s]
+            seg, lo, hi = s[keep], a[keep], b[keep]
+        if len(seg):
+            chunks = hi - lo
+            owner = np.repeat(np.arange(len(seg)), chunks)
+            first = np.repeat(np.cumsum(chunks) - chunks, chunks)
+            offsets = lo[owner] + np.arange(len(owner)) - first
+            s = seg[owner]
+            t = offsets / np.maximum(counts[s] - 1, 1)
+            d = ends[s] - starts[s]
+            x = np.clip(np.rint(starts[s, 0] + t * d[:, 0]).astype(np.int64), 0, width - 1)
+            y = np.clip(np.rint(starts[s, 1] + t * d[:, 1]).astype(np.int64), 0, height - 1)
+            blocked = self.occupancy_map[y, x] == 0
+            hit[s[blocked]] = True
+        return hit
+
+    def save(self, path):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, 'occupancy.npy'), np.asarray(self.occupancy_map))
+        for level, array in enumerate(self.pyramid, 1):
+            np.save(os.path.join(tmp_path, f'level{level}.npy'), array)
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump({'format': FORMAT_VERSION, 'levels': self.levels, 'fingerprint': self.fingerprint()}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        meta_path = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('format') != FORMAT_VERSION:
+            return None
+        mmap_mode = 'r' if mmap else None
+        occupancy_map = np.load(os.path.join(path, 'occupancy.npy'), mmap_mode=mmap_mode)
+        pyramid = [np.load(os.path.join(path, f'level{level}.npy'), mmap_mode=mmap_mode) for level in range(1, meta['levels'] + 1)]
+        return cls(occupancy_map, meta['levels'], pyramid, meta['fingerprint'])
@@ -0,0 +1,41 @@
+from collections import OrderedDict
+
+
+class QueryCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def sync(self, version):
+        # every key carries the roadmap version, so once it moves on no
+        # entry can hit again; drop them instead of waiting for eviction
+        if version != self.version:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.version = version
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def as_dict(self):
+        return {'hits': self.hits, 'misses': self.misses, 'invalidations': self.invalidations, 'size': len(self.entries)}
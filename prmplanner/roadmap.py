@@ -0,0 +1,608 @@
+import heapq
+import math
+import time
+import numpy as np
+from .neighbors import build_index, knn_edges, restore_index
+from .storage import AdjacencyList, EdgeSet, NodeList, RoadmapArrays
+from .stats import NULL_STATS
+from .batch import shortest_path_tree, solve_groups, tree_path
+from .heuristics import LandmarkTable
+from .samplers import make_sampler
+from .components import UnionFind, component_labels
+from .querycache import QueryCache
+from .smoothing import path_length, smooth_path
+from .collision import RectObstacles, as_rects, points_in_rects, segments_intersect_rects
+
+class Roadmap:
+    def __init__(self, map_size, obstacles, num_nodes, k=5, neighbor_method='kdtree', workers=None, stats=None, lazy=False, sampler='uniform', sampler_options=None):
+        self.map_size = map_size
+        self.obstacles = obstacles
+        self.collision = obstacles if hasattr(obstacles, 'segments_in_obstacle') else RectObstacles(obstacles)
+        self.num_nodes = num_nodes
+        self.k = k
+        self.neighbor_method = neighbor_method
+        self.workers = workers
+        self.stats = NULL_STATS if stats is None else stats
+        self.lazy = lazy
+        self.sampler = sampler
+        self.sampler_options = sampler_options or {}
+        self.point_sampler = None
+        self.edge_valid = {}
+        self.blocked_nodes = set()
+        self.max_edge_length = 0.0
+        self.knn_radius = None
+        self.listeners = []
+        self.landmarks = None
+        self.components = UnionFind()
+        self.version = 0
+        self.query_cache = QueryCache()
+        self.tree_cache = QueryCache(maxsize=8)
+        self.goals_seen = QueryCache(maxsize=64)
+        self.nodes = []
+        self.adjacency = []
+        self.edge_set = set()
+        self.index = None
+
+    def build(self):
+        self.sample_nodes()
+        self.connect_nodes()
+        return self
+
+    def sample_nodes(self, batch_size=1024, count=None):
+        if count is None:
+            count = self.num_nodes - len(self.nodes)
+        with self.stats.stage('sample'):
+            if self.point_sampler is None:
+                self.point_sampler = make_sampler(self.sampler, self.map_size, self.collision, **self.sampler_options)
+            sampler = self.point_sampler
+            drawn, rejected = sampler.drawn, sampler.rejected
+            samples = sampler.sample(count, batch_size)
+            self.stats.count('samples_drawn', sampler.drawn - drawn)
+            self.stats.count('samples_rejected', sampler.rejected - rejected)
+            # drawn - rejected also counts free points kept for the next call
+            self.stats.count('samples_accepted', len(samples))
+            for node in samples.tolist():
+                self.add_node(node)
+
+    def in_obstacle(self, node):
+        return bool(self.collision.points_in_obstacle(node)[0])
+
+    def add_node(self, node):
+        self.nodes.append(tuple(node))
+        self.adjacency.append([])
+        self.components.add()
+        return len(self.nodes) - 1
+
+    def add_edge(self, i, j, cost=None, check=True):
+        key = (i, j) if i < j else (j, i)
+        if i == j or key in self.edge_set:
+            return False
+        if check and self.edge_intersects_obstacle(self.nodes[i], self.nodes[j]):
+            return False
+        if cost is None:
+            cost = math.dist(self.nodes[i], self.nodes[j])
+        self.edge_set.add(key)
+        self.changed()
+        self.components.union(i, j)
+        self.max_edge_length = max(self.max_edge_length, cost)
+        self.adjacency[i].append((j, cost))
+        self.adjacency[j].append((i, cost))
+        return True
+
+    def remove_edge(self, i, j):
+        key = (i, j) if i < j else (j, i)
+        if key not in self.edge_set:
+            return False
+        self.edge_set.remove(key)
+        self.changed()
+        self.edge_valid.pop(key, None)
+        self.adjacency[i] = [e for e in self.adjacency[i] if e[0] != j]
+        self.adjacency[j] = [e for e in self.adjacency[j] if e[0] != i]
+        return True
+
+    def changed(self):
+        # edits between a components checkpoint and its rollback only add and
+        # remove temporary query nodes, so they must not invalidate the caches
+        if not self.components.tracking:
+            self.version += 1
+
+    @property
+    def edges(self):
+        return [(self.nodes[i], self.nodes[j]) for i, j in self.edge_set]
+
+    def edge_intersects_obstacle(self, node1, node2):
+        return bool(self.collision.segments_in_obstacle(node1, node2)[0])
+
+    def line_intersects_rect(self, p1, p2, rect):
+        return bool(segments_intersect_rects(p1, p2, as_rects(rect))[0])
+
+    def distance(self, node1, node2):
+        return np.linalg.norm(np.array(node1) - np.array(node2))
+
+    def connect_nodes(self, start=0):
+        self.version += 1
+        with self.stats.stage('index'):
+            self.index = build_index(self.nodes, self.neighbor_method)
+            self.knn_radius = None
+            self.landmarks = None
+        checker = None if self.lazy else self.collision
+        if start:
+            rows, cols = knn_edges(self.index, self.k, checker, start=start, stats=self.stats)
+        elif self.workers and self.workers > 1:
+            from .parallel import parallel_knn_edges
+            with self.stats.stage('parallel_connect'):
+                rows, cols = parallel_knn_edges(self.index.points, self.k, checker, neighbor_method=self.neighbor_method, workers=self.workers, stats=self.stats, index=self.index)
+        else:
+            rows, cols = knn_edges(self.index, self.k, checker, stats=self.stats)
+        with self.stats.stage('graph'):
+            points = self.index.points
+            costs = np.linalg.norm(points[rows] - points[cols], axis=1)
+            added = 0
+            for i, j, cost in zip(rows.tolist(), cols.tolist(), costs.tolist()):
+                added += self.add_edge(i, j, cost, check=False)
+            self.stats.count('edges_added', added)
+
+    def grow(self, count):
+        first = len(self.nodes)
+        self.sample_nodes(count=count)
+        if len(self.nodes) > first:
+            self.connect_nodes(start=first)
+        self.stats.count('growth_rounds')
+        return len(self.nodes) - first
+
+    def build_until_connected(self, start, goal, densify=False, batch=None):
+        batch = batch or max(10 * self.k, self.num_nodes // 16)
+        while len(self.nodes) < self.num_nodes and (self.index is None or not self.connected(start, goal)):
+            if not self.grow(min(batch, self.num_nodes - len(self.nodes))):
+                break
+            batch *= 2
+        if densify and len(self.nodes) < self.num_nodes:
+            self.grow(self.num_nodes - len(self.nodes))
+        return self
+
+    def connected(self, i, j):
+        return self.components.connected(i, j)
+
+    def build_params(self):
+        sampler = self.sampler if isinstance(self.sampler, str) else type(self.sampler).__name__
+        params = {'map_size': list(self.map_size), 'num_nodes': self.num_nodes, 'k': self.k, 'neighbor_method': self.neighbor_method, 'lazy': self.lazy, 'sampler': sampler}
+        if self.sampler_options:
+            params['sampler_options'] = dict(self.sampler_options)
+        return params
+
+    def precompute_heuristic(self, num_landmarks=16, all_pairs_limit=1000, seed=0):
+        with self.stats.stage('precompute'):
+            if len(self.nodes) <= all_pairs_limit:
+                self.landmarks = LandmarkTable.build_all_pairs(self.adjacency, len(self.nodes))
+            else:
+                self.landmarks = LandmarkTable.build(self.adjacency, len(self.nodes), num_landmarks, seed)
+        return self.landmarks
+
+    def heuristic(self, goal):
+        if self.landmarks is None or self.landmarks.num_nodes > len(self.nodes):
+            return None
+        return self.landmarks.heuristic(self.adjacency, goal, self.nodes)
+
+    def to_arrays(self):
+        pairs = np.array(sorted(self.edge_set), dtype=np.int64).reshape(-1, 2)
+        costs = [dict(self.adjacency[i])[j] for i, j in pairs.tolist()]
+        arrays = RoadmapArrays.from_edges(self.nodes, pairs[:, 0], pairs[:, 1], costs)
+        arrays.labels = [self.components.find(i) for i in range(len(self.nodes))]
+        if self.index is not None and len(self.index) == len(self.nodes):
+            arrays.index = self.index.to_arrays()
+        if self.landmarks is not None:
+            arrays.landmarks = self.landmarks.landmarks
+            arrays.landmark_distances = self.landmarks.distances
+            arrays.meta['all_pairs'] = self.landmarks.all_pairs
+        return arrays
+
+    def set_arrays(self, arrays):
+        # the arrays stay the backing store (memory-mapped after load); rows
+        # and edge keys are turned into Python objects only when touched
+        self.nodes = NodeList(arrays.points)
+        self.adjacency = AdjacencyList(arrays.indptr, arrays.indices, arrays.weights)
+        self.edge_set = EdgeSet(arrays.indptr, arrays.indices)
+        self.edge_valid = {}
+        self.blocked_nodes = set()
+        self.max_edge_length = float(np.max(arrays.weights, initial=0.0))
+        self.knn_radius = None
+        self.landmarks = None
+        self.version += 1
+        if arrays.labels is not None:
+            self.components = UnionFind.from_labels(arrays.labels)
+        else:
+            rows, cols, _ = arrays.edge_pairs()
+            self.components = UnionFind.from_labels(component_labels(arrays.num_nodes, rows, cols))
+        if arrays.index is not None:
+            self.index = restore_index(arrays.points, arrays.index, self.neighbor_method)
+        else:
+            self.index = build_index(arrays.points, self.neighbor_method)
+        if arrays.landmarks is not None:
+            self.landmarks = LandmarkTable(arrays.landmarks, arrays.landmark_distances, arrays.meta.get('all_pairs', False))
+        return self
+
+    def save(self, path):
+        self.to_arrays().save(path, self.collision.fingerprint(), self.build_params())
+
+    def load(self, path, mmap=True):
+        arrays = RoadmapArrays.load(path, self.collision.fingerprint(), self.build_params(), mmap)
+        if arrays is None:
+            return False
+        self.set_arrays(arrays)
+        return True
+
+    def add_obstacle(self, rect):
+        self.collision.add(rect)
+        self.obstacles = [tuple(r) for r in self.collision.rects.tolist()]
+        return self.repair([rect])
+
+    def remove_obstacle(self, index):
+        rect = self.collision.remove(index)
+        self.obstacles = [tuple(r) for r in self.collision.rects.tolist()]
+        return self.repair([rect])
+
+    def move_obstacle(self, index, rect):
+        old = self.collision.replace(index, rect)
+        self.obstacles = [tuple(r) for r in self.collision.rects.tolist()]
+        return self.repair([old, rect])
+
+    def update_occupancy(self, x, y, patch):
+        box = self.collision.update(x, y, patch)
+        if box is None:
+            return set()
+        return self.repair([box])
+
+    def repair(self, boxes):
+        boxes = as_rects(boxes)
+        if self.knn_radius is None:
+            distances, _ = self.index.query(self.index.points, self.k + 1)
+            self.knn_radius = float(distances[np.isfinite(distances)].max(initial=0.0))
+        reach = max(self.max_edge_length, self.knn_radius)
+        self.landmarks = None
+        self.version += 1
+        lo, hi = boxes[:, :2].min(axis=0) - reach, boxes[:, 2:].max(axis=0) + reach
+        ids = np.union1d(self.index.query_box(lo, hi), np.arange(len(self.index), len(self.nodes)))
+        changed = set()
+        with self.stats.stage('repair'):
+            if len(ids):
+                points = np.array([self.nodes[i] for i in ids.tolist()])
+                inside = points_in_rects(points, boxes)
+                blocked = self.collision.points_in_obstacle(points[inside])
+                for i, hit in zip(ids[inside].tolist(), blocked):
+                    if hit and i not in self.blocked_nodes:
+                        self.blocked_nodes.add(i)
+                        for j, _ in list(self.adjacency[i]):
+                            self.remove_edge(i, j)
+                            changed.update((i, j))
+                    elif not hit:
+                        self.blocked_nodes.discard(i)
+            changed |= self._revalidate_edges(ids, boxes)
+            changed |= self._reconnect_nodes(ids[ids < len(self.index)], boxes)
+        for listener in self.listeners:
+            listener(changed)
+        return changed
+
+    def _revalidate_edges(self, ids, boxes):
+        pairs = sorted({(i, j) if i < j else (j, i) for i in ids.tolist() for j, _ in self.adjacency[i]})
+        if not pairs:
+            return set()
+        starts = [self.nodes[i] for i, _ in pairs]
+        ends = [self.nodes[j] for _, j in pairs]
+        touched = segments_intersect_rects(starts, ends, boxes)
+        pairs = [key for key, hit in zip(pairs, touched) if hit]
+        if self.lazy:
+            for key in pairs:
+                self.edge_valid.pop(key, None)
+            return set()
+        if not pairs:
+            return set()
+        self.stats.count('collision_checks', len(pairs))
+        blocked = self.collision.segments_in_obstacle([self.nodes[i] for i, _ in pairs], [self.nodes[j] for _, j in pairs])
+        changed = set()
+        for key, hit in zip(pairs, blocked):
+            if hit:
+                self.remove_edge(*key)
+                changed.update(key)
+        return changed
+
+    def _reconnect_nodes(self, ids, boxes):
+        ids = np.array([i for i in ids.tolist() if i not in self.blocked_nodes], dtype=np.int64)
+        if not len(ids):
+            return set()
+        points = self.index.points
+        _, neighbors = self.index.query(points[ids], self.k + 1)
+        rows = np.repeat(ids, neighbors.shape[1])
+        cols = neighbors.ravel()
+        keep = cols >= 0
+        rows, cols = rows[keep], cols[keep]
+        keep = (points[rows] != points[cols]).any(axis=1)
+        rows, cols = rows[keep], cols[keep]
+        pairs = sorted({(i, j) if i < j else (j, i) for i, j in zip(rows.tolist(), cols.tolist())
+                        if j not in self.blocked_nodes and ((i, j) if i < j else (j, i)) not in self.edge_set})
+        if not pairs:
+            return set()
+        starts = points[[i for i, _ in pairs]]
+        ends = points[[j for _, j in pairs]]
+        touched = segments_intersect_rects(starts, ends, boxes)
+        pairs = [key for key, hit in zip(pairs, touched) if hit]
+        if not pairs:
+            return set()
+        if not self.lazy:
+            self.stats.count('collision_checks', len(pairs))
+            free = ~self.collision.segments_in_obstacle(points[[i for i, _ in pairs]], points[[j for _, j in pairs]])
+            pairs = [key for key, ok in zip(pairs, free) if ok]
+        changed = set()
+        for i, j in pairs:
+            if self.add_edge(i, j, check=False):
+                changed.update((i, j))
+        return changed
+
+    def connect_query(self, point):
+        return self.connect_queries([point])[0]
+
+    def connect_queries(self, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        ids = [self.add_node(point) for point in points.tolist()]
+        with self.stats.stage('neighbors'):
+            _, neighbors = self.index.query(points, self.k)
+        rows = np.repeat(np.arange(len(points)), neighbors.shape[1])
+        cols = neighbors.ravel()
+        keep = cols >= 0
+        rows, cols = rows[keep], cols[keep]
+        if len(cols):
+            self.stats.count('collision_checks', len(cols))
+            with self.stats.stage('collision'):
+                free = ~self.collision.segments_in_obstacle(points[rows], self.index.points[cols])
+            for row, j in zip(rows[free].tolist(), cols[free].tolist()):
+                i = ids[row]
+                if self.add_edge(i, j, check=False):
+                    self.edge_valid[(j, i)] = True
+        return ids
+
+    def remove_last_nodes(self, count):
+        for i in range(len(self.nodes) - count, len(self.nodes)):
+            for j, _ in list(self.adjacency[i]):
+                self.remove_edge(i, j)
+        del self.nodes[len(self.nodes) - count:]
+        del self.adjacency[len(self.adjacency) - count:]
+        if count and not self.components.tracking:
+            self.rebuild_components()
+
+    def rebuild_components(self):
+        pairs = np.array(sorted(self.edge_set), dtype=np.int64).reshape(-1, 2)
+        self.components = UnionFind.from_edges(len(self.nodes), pairs[:, 0].tolist(), pairs[:, 1].tolist())
+
+    def snap(self, point):
+        distances, ids = self.index.query(point, 1)
+        if distances[0, 0] <= 1e-9:
+            return int(ids[0, 0])
+        return tuple(float(value) for value in point)
+
+    def query(self, start, goal, return_stats=False):
+        if self.index is None:
+            self.build()
+        self.query_cache.sync((self.version, len(self.nodes)))
+        key = (self.snap(start), self.snap(goal))
+        path = self.query_cache.get(key)
+        if path is None:
+            self.stats.count('cache_misses')
+            path = self._query(start, goal, key[1])
+            self.query_cache.sync((self.version, len(self.nodes)))
+            self.query_cache.put(key, path)
+        else:
+            self.stats.count('cache_hits')
+        path = list(path)
+        return (path, self.stats) if return_stats else path
+
+    def _query(self, start, goal, goal_key):
+        num_nodes = len(self.nodes)
+        mark = self.components.checkpoint()
+        try:
+            if self.lazy:
+                start_id = self.connect_query(start)
+                goal_id = self.connect_query(goal)
+                return self.a_star(start_id, goal_id)
+            self.tree_cache.sync((self.version, num_nodes))
+            self.goals_seen.sync((self.version, num_nodes))
+            tree = self.tree_cache.get(goal_key)
+            if tree is None and self.goals_seen.get(goal_key) is None:
+                # a one-off goal is answered by A* with its early exit; the full
+                # tree only pays off once the same goal comes back
+                self.goals_seen.put(goal_key, True)
+                start_id = self.connect_query(start)
+                goal_id = self.connect_query(goal)
+                return self.a_star(start_id, goal_id)
+            if tree is None:
+                goal_id = self.connect_query(goal)
+                with self.stats.stage('search'):
+                    dist, parent, expanded = shortest_path_tree(self.adjacency, goal_id)
+                self.stats.count('nodes_expanded', expanded)
+                tree = (dist, parent, goal_id, self.nodes[goal_id])
+                self.tree_cache.put(goal_key, tree)
+            else:
+                self.stats.count('tree_hits')
+            return self._tree_query(self.connect_query(start), tree)
+        finally:
+            self.remove_last_nodes(len(self.nodes) - num_nodes)
+            self.components.rollback(mark)
+
+    def _tree_query(self, start_id, tree):
+        # the goal's tree already holds every node's cost-to-go, so a new
+        # start only has to pick its best neighbour and walk the parents
+        dist, parent, goal_id, goal_point = tree
+        best, via = float('inf'), None
+        for j, cost in self.adjacency[start_id]:
+            if cost + dist.get(j, float('inf')) < best:
+                best, via = cost + dist[j], j
+        if via is None:
+            self.stats.count('disconnected_skips')
+            return []
+        ids = tree_path(parent, via, goal_id)
+        return [self.nodes[start_id]] + [self.nodes[i] for i in ids[:-1]] + [goal_point]
+
+    def batch_query(self, starts, goals, workers=None, executor='thread', return_stats=False):
+        if self.index is None:
+            self.build()
+        starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+        goals = np.asarray(goals, dtype=float).reshape(-1, 2)
+        num_nodes = len(self.nodes)
+        mark = self.components.checkpoint()
+        try:
+            endpoints, inverse = np.unique(np.vstack([starts, goals]), axis=0, return_inverse=True)
+            ids = np.asarray(self.connect_queries(endpoints))[inverse.ravel()]
+            start_ids, goal_ids = ids[:len(starts)].tolist(), ids[len(starts):].tolist()
+            groups = {}
+            results = [None] * len(starts)
+            for query, goal in enumerate(goal_ids):
+                if self.connected(start_ids[query], goal):
+                    groups.setdefault(goal, []).append(query)
+                else:
+                    self.stats.count('disconnected_skips')
+                    results[query] = {'path': [], 'cost': float('inf'), 'expanded': 0, 'seconds': 0.0, 'group_size': 0}
+            while groups:
+                with self.stats.stage('search'):
+                    jobs = [(goal, [start_ids[q] for q in queries]) for goal, queries in groups.items()]
+                    solved = solve_groups(self.adjacency, jobs, workers, executor, num_nodes)
+                self.stats.count('trees_built', len(jobs))
+                retry = {}
+                for (goal, _), queries, (paths, costs, expanded, seconds) in zip(jobs, groups.values(), solved):
+                    self.stats.count('nodes_expanded', expanded)
+                    for q, path, cost in zip(queries, paths, costs):
+                        if self.lazy and path and not self.validate_path(path):
+                            self.stats.count('lazy_replans')
+                            retry.setdefault(goal, []).append(q)
+                            continue
+                        results[q] = {'path': [self.nodes[i] for i in path], 'cost': cost if path else float('inf'), 'expanded': expanded, 'seconds': seconds, 'group_size': len(queries)}
+                groups = retry
+        finally:
+            self.remove_last_nodes(len(self.nodes) - num_nodes)
+            self.components.rollback(mark)
+        paths = [result.pop('path') for result in results]
+        return (paths, results) if return_stats else paths
+
+    def smooth(self, path, **options):
+        with self.stats.stage('smooth'):
+            return smooth_path(path, self.collision, **options)
+
+    def a_star(self, start, goal):
+        if not self.connected(start, goal):
+            self.stats.count('disconnected_skips')
+            return []
+        path = self.search(start, goal)
+        while self.lazy and path and not self.validate_path(path):
+            self.stats.count('lazy_replans')
+            path = self.search(start, goal)
+        return [self.nodes[i] for i in path]
+
+    def validate_path(self, path):
+        pairs = [(i, j) if i < j else (j, i) for i, j in zip(path, path[1:])]
+        pairs = [key for key in dict.fromkeys(pairs) if key not in self.edge_valid]
+        if not pairs:
+            return True
+        self.stats.count('collision_checks', len(pairs))
+        with self.stats.stage('collision'):
+            starts = [self.nodes[i] for i, _ in pairs]
+            ends = [self.nodes[j] for _, j in pairs]
+            blocked = self.collision.segments_in_obstacle(starts, ends)
+        for key, hit in zip(pairs, blocked):
+            if hit:
+                self.remove_edge(*key)
+            else:
+                self.edge_valid[key] = True
+        if blocked.any():
+            self.version += 1
+        return not blocked.any()
+
+    def search(self, start, goal):
+        with self.stats.stage('search'):
+            goal_node = self.nodes[goal]
+            h = self.heuristic(goal)
+            open_list = [(math.dist(self.nodes[start], goal_node), start)]
+            came_from = {}
+            g_score = {start: 0.0}
+            closed = set()
+            path = []
+
+            while open_list:
+                _, current = heapq.heappop(open_list)
+                if current == goal:
+                    path = self.reconstruct_path(came_from, current)
+                    break
+                if current in closed:
+                    continue
+                closed.add(current)
+
+                improved = []
+                for neighbor, cost in self.adjacency[current]:
+                    if neighbor in closed:
+                        continue
+                    tentative_g_score = g_score[current] + cost
+                    if tentative_g_score < g_score.get(neighbor, float('inf')):
+                        came_from[neighbor] = current
+                        g_score[neighbor] = tentative_g_score
+                        improved.append(neighbor)
+                if not improved:
+                    continue
+                if h is None:
+                    estimates = [math.dist(self.nodes[neighbor], goal_node) for neighbor in improved]
+                else:
+                    estimates = h(improved)
+                for neighbor, estimate in zip(improved, estimates):
+                    heapq.heappush(open_list, (g_score[neighbor] + estimate, neighbor))
+
+            self.stats.count('nodes_expanded', len(closed))
+        return path
+
+    def reconstruct_path(self, came_from, current):
+        total_path = [current]
+        while current in came_from:
+            current = came_from[current]
+            total_path.append(current)
+        total_path.reverse()
+        return total_path
+
+class PRM(Roadmap):
+    def __init__(self, start, goal, num_nodes, map_size, obstacles, k=5, neighbor_method='kdtree', workers=None, stats=None, lazy=False, sampler='uniform', sampler_options=None):
+        super().__init__(map_size, obstacles, num_nodes, k, neighbor_method, workers, stats, lazy, sampler, sampler_options)
+        self.start = start
+        self.goal = goal
+        self.add_node(start)
+        self.add_node(goal)
+
+    def find_path(self, return_stats=False, early_stop=False, densify=False, time_budget=None):
+        if time_budget is not None:
+            path = []
+            for result in self.anytime(time_budget=time_budget):
+                path = result['path']
+        elif early_stop:
+            self.build_until_connected(0, 1, densify)
+            path = self.a_star(0, 1)
+        else:
+            self.build()
+            path = self.a_star(0, 1)
+        return (path, self.stats) if return_stats else path
+
+    def anytime(self, batch=None, time_budget=None, min_improvement=0.01, patience=2):
+        begin = time.perf_counter()
+        batch = batch or max(10 * self.k, self.num_nodes // 16)
+        best, best_cost, stalled = [], float('inf'), 0
+        while len(self.nodes) < self.num_nodes:
+            round_start = time.perf_counter()
+            if not self.grow(min(batch, self.num_nodes - len(self.nodes))):
+                break
+            improved = False
+            if self.connected(0, 1):
+                path = self.a_star(0, 1)
+                cost = path_length(path) if path else float('inf')
+                if cost < best_cost:
+                    improved = not best or min_improvement is None or best_cost - cost > min_improvement * best_cost
+                    best, best_cost = path, cost
+            now = time.perf_counter()
+            yield {'path': best, 'cost': best_cost, 'nodes': len(self.nodes), 'edges': len(self.edge_set), 'elapsed': now - begin}
+            if best:
+                stalled = 0 if improved else stalled + 1
+                if min_improvement is not None and stalled >= patience:
+                    return
+            # stop early if another round of the same size would overrun the budget
+            if time_budget is not None and now - begin + (now - round_start) > time_budget:
+                return
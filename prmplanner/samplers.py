@@ -0,0 +1,170 @@
+import warnings
+import numpy as np
+
+
+def radical_inverse(indices, base):
+    indices = np.asarray(indices, dtype=np.int64).copy()
+    result = np.zeros(len(indices))
+    scale = 1.0 / base
+    while indices.any():
+        result += (indices % base) * scale
+        indices //= base
+        scale /= base
+    return result
+
+
+def sobol_2d(indices):
+    indices = np.asarray(indices, dtype=np.uint64)
+    x = np.zeros(len(indices), dtype=np.uint64)
+    y = np.zeros(len(indices), dtype=np.uint64)
+    v = 1 << 31
+    for bit in range(32):
+        mask = ((indices >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        x[mask] ^= np.uint64(1 << (31 - bit))
+        y[mask] ^= np.uint64(v)
+        v ^= v >> 1
+    return np.column_stack([x, y]) / float(1 << 32)
+
+
+class Sampler:
+    def __init__(self, map_size, checker=None, seed=None):
+        self.map_size = np.asarray(map_size, dtype=float)
+        self.checker = checker
+        if seed is None:
+            seed = np.random.randint(2 ** 31)
+        self.rng = np.random.default_rng(seed)
+        self.drawn = 0
+        self.rejected = 0
+        self.spare = np.empty((0, 2))
+
+    def blocked(self, points):
+        if self.checker is None:
+            return np.zeros(len(points), dtype=bool)
+        return self.checker.points_in_obstacle(points)
+
+    def uniform(self, size):
+        return self.rng.uniform((0, 0), self.map_size, (size, 2))
+
+    def candidates(self, size):
+        return self.uniform(size)
+
+    def accept(self, points):
+        return ~self.blocked(points)
+
+    def sample(self, count, batch_size=1024, max_batches=1000):
+        # free points left over from the last batch are handed out first, so
+        # none are thrown away and quasi-random sequences are used in order
+        batches = [self.spare]
+        found = len(self.spare)
+        for _ in range(max_batches):
+            if found >= count:
+                break
+            points = self.candidates(batch_size)
+            keep = self.accept(points)
+            self.drawn += len(points)
+            self.rejected += int(len(points) - keep.sum())
+            batches.append(points[keep])
+            found += int(keep.sum())
+        if found < count:
+            warnings.warn(f'{type(self).__name__} found only {found} of {count} free samples in {max_batches} batches of {batch_size}', RuntimeWarning, stacklevel=2)
+        points = np.vstack(batches)
+        self.spare = points[count:]
+        return points[:count]
+
+
+class UniformSampler(Sampler):
+    pass
+
+
+class HaltonSampler(Sampler):
+    def __init__(self, map_size, checker=None, seed=None):
+        super().__init__(map_size, checker, seed)
+        self.offset = int(self.rng.integers(1 << 20))
+        self.shift = self.rng.uniform(size=2)
+
+    def sequence(self, indices):
+        return np.column_stack([radical_inverse(indices, 2), radical_inverse(indices, 3)])
+
+    def candidates(self, size):
+        indices = np.arange(self.offset, self.offset + size)
+        self.offset += size
+        return ((self.sequence(indices) + self.shift) % 1.0) * self.map_size
+
+
+class SobolSampler(HaltonSampler):
+    def sequence(self, indices):
+        return sobol_2d(indices)
+
+
+class GaussianSampler(Sampler):
+    def __init__(self, map_size, checker=None, seed=None, sigma=None, uniform_fraction=0.2):
+        if checker is None:
+            raise ValueError('obstacle-biased sampling needs a collision checker')
+        super().__init__(map_size, checker, seed)
+        self.sigma = sigma if sigma is not None else 0.02 * float(self.map_size.max())
+        self.uniform_fraction = uniform_fraction
+
+    def pairs(self, size):
+        first = self.uniform(size)
+        second = first + self.rng.normal(0.0, self.sigma, (size, 2))
+        return first, np.clip(second, 0, self.map_size)
+
+    def near_obstacles(self, size):
+        first, second = self.pairs(size)
+        first_blocked, second_blocked = self.blocked(first), self.blocked(second)
+        return np.where(first_blocked[:, None], second, first), first_blocked != second_blocked
+
+    def candidates(self, size):
+        num_uniform = int(round(size * self.uniform_fraction))
+        points, keep = self.near_obstacles(size - num_uniform)
+        uniform = self.uniform(num_uniform)
+        self._accept = np.concatenate([keep, ~self.blocked(uniform)])
+        return np.vstack([points, uniform])
+
+    def accept(self, points):
+        return self._accept
+
+
+class BridgeSampler(GaussianSampler):
+    def near_obstacles(self, size):
+        first, second = self.pairs(size)
+        middle = (first + second) / 2
+        return middle, self.blocked(first) & self.blocked(second) & ~self.blocked(middle)
+
+
+class FreePixelSampler(Sampler):
+    def __init__(self, map_size, checker=None, seed=None):
+        super().__init__(map_size, checker, seed)
+        occupancy_map = getattr(checker, 'occupancy_map', None)
+        if occupancy_map is None:
+            raise ValueError('free-pixel sampling needs an occupancy grid checker')
+        self.width = occupancy_map.shape[1]
+        self.free = np.flatnonzero(np.asarray(occupancy_map).ravel() != 0)
+
+    def candidates(self, size):
+        if not len(self.free):
+            return np.empty((0, 2))
+        pixels = self.free[self.rng.integers(len(self.free), size=size)]
+        y, x = np.divmod(pixels, self.width)
+        return np.column_stack([x, y]) + self.rng.uniform(size=(size, 2))
+
+    def accept(self, points):
+        return np.ones(len(points), dtype=bool)
+
+
+SAMPLERS = {
+    'uniform': UniformSampler,
+    'halton': HaltonSampler,
+    'sobol': SobolSampler,
+    'gaussian': GaussianSampler,
+    'bridge': BridgeSampler,
+    'free_pixels': FreePixelSampler,
+}
+
+
+def make_sampler(sampler, map_size, checker=None, seed=None, **options):
+    if isinstance(sampler, Sampler):
+        return sampler
+    if sampler not in SAMPLERS:
+        raise ValueError(f'unknown sampler {sampler!r}, expected one of {sorted(SAMPLERS)}')
+    return SAMPLERS[sampler](map_size, checker, seed, **options)
@@ -0,0 +1,97 @@
+import queue
+import time
+import traceback
+import concurrent.futures
+
+
+class PlanScheduler:
+    # runs planning jobs off the Tk thread and hands results back through a
+    # queue drained by root.after, so callbacks always run on the GUI thread
+    def __init__(self, root, callback, workers=1, deadline_ms=None, poll_ms=15, on_error=None):
+        self.root = root
+        self.callback = callback
+        self.on_error = on_error
+        self.deadline_ms = deadline_ms
+        self.poll_ms = poll_ms
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self.results = queue.Queue()
+        self.pending = {}
+        self.latest = {}
+        self.delivered = {}
+        self.latencies = []
+        self.dropped = 0
+        self.overruns = 0
+        self.errors = 0
+        self.polling = None
+
+    def submit(self, key, fn, *args, **kwargs):
+        generation = self.latest.get(key, 0) + 1
+        self.latest[key] = generation
+        previous = self.pending.get(key)
+        if previous is not None and previous.cancel():
+            self.dropped += 1
+        submitted = time.perf_counter()
+        future = self.executor.submit(fn, *args, **kwargs)
+        self.pending[key] = future
+        future.add_done_callback(lambda done: self.results.put((key, generation, submitted, time.perf_counter(), done)))
+        self._schedule_poll()
+        return generation
+
+    def busy(self, key):
+        return key in self.pending
+
+    def _schedule_poll(self):
+        if self.polling is None:
+            self.polling = self.root.after(self.poll_ms, self.poll)
+
+    def poll(self):
+        self.polling = None
+        try:
+            while True:
+                try:
+                    key, generation, submitted, finished, future = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if self.pending.get(key) is future:
+                    del self.pending[key]
+                if future.cancelled():
+                    continue
+                if generation <= self.delivered.get(key, 0):
+                    self.dropped += 1
+                    continue
+                self.delivered[key] = generation
+                latency = finished - submitted
+                self.latencies.append(latency)
+                if self.deadline_ms is not None and latency * 1000 > self.deadline_ms:
+                    self.overruns += 1
+                # a failing plan or callback must not stop the polling loop
+                try:
+                    self.callback(key, future.result(), latency)
+                except Exception as error:
+                    self.errors += 1
+                    self.report(key, error)
+        finally:
+            if self.pending or not self.results.empty():
+                self._schedule_poll()
+
+    def report(self, key, error):
+        if self.on_error is not None:
+            self.on_error(key, error)
+            return
+        print(f'{key} plan failed:')
+        traceback.print_exception(error)
+
+    def summary(self):
+        if not self.latencies:
+            return f'no plans delivered, dropped={self.dropped}, errors={self.errors}'
+        latencies = sorted(self.latencies)
+        median = latencies[len(latencies) // 2] * 1000
+        worst = latencies[-1] * 1000
+        return f'{len(latencies)} plans, median {median:.1f} ms, max {worst:.1f} ms | overruns={self.overruns}, dropped={self.dropped}, errors={self.errors}'
+
+    def close(self):
+        if self.polling is not None:
+            self.root.after_cancel(self.polling)
+            self.polling = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.pending.clear()
@@ -0,0 +1,130 @@
+import numpy as np
+
+
+def path_length(points):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) < 2:
+        return 0.0
+    return float(np.linalg.norm(np.diff(points, axis=0), axis=1).sum())
+
+
+def shortcut_greedy(points, checker):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) < 3:
+        return points
+    keep = [0]
+    i = 0
+    while i < len(points) - 1:
+        targets = np.arange(len(points) - 1, i + 1, -1)
+        blocked = checker.segments_in_obstacle(np.repeat(points[i:i + 1], len(targets), axis=0), points[targets])
+        free = np.flatnonzero(~blocked)
+        i = int(targets[free[0]]) if len(free) else i + 1
+        keep.append(i)
+    return points[keep]
+
+
+def shortcut_random(points, checker, iterations=10, batch_size=64, rng=None):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    rng = rng if rng is not None else np.random.default_rng()
+    for _ in range(iterations):
+        n = len(points)
+        if n < 3:
+            break
+        # shortcut between random points along two segments, not just vertices
+        seg = np.sort(rng.integers(0, n - 1, (batch_size, 2)), axis=1)
+        seg = seg[seg[:, 1] > seg[:, 0]]
+        if not len(seg):
+            continue
+        t = rng.uniform(size=(len(seg), 2))
+        a = points[seg[:, 0]] + t[:, :1] * (points[seg[:, 0] + 1] - points[seg[:, 0]])
+        b = points[seg[:, 1]] + t[:, 1:] * (points[seg[:, 1] + 1] - points[seg[:, 1]])
+        cumulative = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))])
+        along_a = cumulative[seg[:, 0]] + t[:, 0] * (cumulative[seg[:, 0] + 1] - cumulative[seg[:, 0]])
+        along_b = cumulative[seg[:, 1]] + t[:, 1] * (cumulative[seg[:, 1] + 1] - cumulative[seg[:, 1]])
+        gain = (along_b - along_a) - np.linalg.norm(b - a, axis=1)
+        useful = gain > 1e-9
+        if not useful.any():
+            continue
+        seg, a, b, gain = seg[useful], a[useful], b[useful], gain[useful]
+        # raster checks are not monotone, so the two pieces left of the
+        # original segments need their own check alongside the shortcut
+        blocked = checker.segments_in_obstacle(np.vstack([a, points[seg[:, 0]], b]), np.vstack([b, a, points[seg[:, 1] + 1]]))
+        free = ~blocked.reshape(3, -1).any(axis=0)
+        taken = []
+        candidates = np.flatnonzero(free)
+        for k in candidates[np.argsort(-gain[candidates])]:
+            if all(seg[k, 1] < lo or seg[k, 0] > hi for lo, hi, _, _ in taken):
+                taken.append((seg[k, 0], seg[k, 1], a[k], b[k]))
+        if not taken:
+            continue
+        parts, last = [], 0
+        for lo, hi, start, end in sorted(taken, key=lambda item: item[0]):
+            parts.append(points[last:lo + 1])
+            parts.append(np.array([start, end]))
+            last = hi + 1
+        parts.append(points[last:])
+        points = np.vstack(parts)
+        # a shortcut ending right at a vertex leaves a near-duplicate point
+        step = np.linalg.norm(np.diff(points, axis=0), axis=1)
+        keep = np.concatenate([[True], step > 1e-6])
+        keep[-1] = True
+        points = points[keep]
+        if len(points) > 2 and np.linalg.norm(points[-1] - points[-2]) <= 1e-6:
+            points = np.delete(points, -2, axis=0)
+    return points
+
+
+def round_corners(points, fraction=0.4, samples=8):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    prev, corner, nxt = points[:-2], points[1:-1], points[2:]
+    before = np.linalg.norm(prev - corner, axis=1)[:, None]
+    after = np.linalg.norm(nxt - corner, axis=1)[:, None]
+    radius = fraction * np.minimum(before, after)
+    a = corner + (prev - corner) / np.maximum(before, 1e-12) * radius
+    b = corner + (nxt - corner) / np.maximum(after, 1e-12) * radius
+    t = np.linspace(0, 1, samples)[None, :, None]
+    return (1 - t) ** 2 * a[:, None] + 2 * (1 - t) * t * corner[:, None] + t ** 2 * b[:, None]
+
+
+def smooth_spline(points, checker, fraction=0.4, samples=8):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) < 3:
+        return points
+    curves = round_corners(points, min(fraction, 0.5), samples)
+    starts = curves[:, :-1].reshape(-1, 2)
+    ends = curves[:, 1:].reshape(-1, 2)
+    blocked = checker.segments_in_obstacle(starts, ends).reshape(len(curves), -1).any(axis=1)
+    while True:
+        parts = [points[:1]]
+        parts += [points[i + 1:i + 2] if hit else curves[i] for i, hit in enumerate(blocked)]
+        parts.append(points[-1:])
+        # the straight connectors between curves are sub-segments of the
+        # original legs; a blocked one puts the corners on both sides back
+        connectors = checker.segments_in_obstacle([part[-1] for part in parts[:-1]], [part[0] for part in parts[1:]])
+        before = blocked.copy()
+        for leg in np.flatnonzero(connectors):
+            blocked[max(leg - 1, 0):leg + 1] = True
+        if not connectors.any() or (blocked == before).all():
+            return np.vstack(parts)
+
+
+def smooth_path(points, checker, shortcut_iterations=20, batch_size=64, spline=True, corner_fraction=0.4, corner_samples=8, seed=None):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) < 3:
+        return [tuple(p) for p in points.tolist()], path_length(points)
+    stages = [points, shortcut_greedy(points, checker)]
+    stages.append(shortcut_random(stages[-1], checker, shortcut_iterations, batch_size, np.random.default_rng(seed)))
+    if spline:
+        stages.append(smooth_spline(stages[-1], checker, corner_fraction, corner_samples))
+    # every emitted segment is checked once more in a single batch; if a stage
+    # still produced a blocked one, fall back to the last stage that did not
+    sizes = [len(stage) - 1 for stage in stages[1:]]
+    starts = np.vstack([stage[:-1] for stage in stages[1:]])
+    ends = np.vstack([stage[1:] for stage in stages[1:]])
+    blocked = np.split(checker.segments_in_obstacle(starts, ends), np.cumsum(sizes)[:-1])
+    points = stages[0]
+    for stage, hit in zip(stages[1:], blocked):
+        if hit.any():
+            break
+        points = stage
+    return [tuple(p) for p in points.tolist()], path_length(points)
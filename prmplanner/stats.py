@@ -0,0 +1,70 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class PlannerStats:
+    enabled = True
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        self.timings = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            if self.callback is not None:
+                self.callback(name, elapsed, self)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + int(amount)
+
+    def merge(self, counters):
+        for name, amount in counters.items():
+            self.count(name, amount)
+
+    @property
+    def total(self):
+        return sum(self.timings.values())
+
+    def as_dict(self):
+        return {'timings': dict(self.timings), 'counters': dict(self.counters), 'total': self.total}
+
+    def summary(self):
+        timings = ', '.join(f'{name} {seconds * 1000:.1f} ms' for name, seconds in self.timings.items())
+        counters = ', '.join(f'{name}={value}' for name, value in self.counters.items())
+        return f'{timings} | {counters}'
+
+
+class NullStats:
+    enabled = False
+    timings = {}
+    counters = {}
+    total = 0.0
+    _context = nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+    def count(self, name, amount=1):
+        pass
+
+    def merge(self, counters):
+        pass
+
+    def reset(self):
+        pass
+
+    def as_dict(self):
+        return {'timings': {}, 'counters': {}, 'total': 0.0}
+
+
+NULL_STATS = NullStats()
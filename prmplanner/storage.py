@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+
+FORMAT_VERSION = 2
+ARRAYS = ('points', 'indptr', 'indices', 'weights')
+DTYPES = (np.float64, np.int64, np.int32, np.float64)
+OPTIONAL_ARRAYS = {'landmarks': np.int32, 'landmark_distances': np.float32, 'labels': np.int64}
+
+
+def array_hash(*arrays):
+    digest = hashlib.sha1()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def normalize_params(params):
+    return json.loads(json.dumps(params or {}, sort_keys=True))
+
+
+class RoadmapArrays:
+    def __init__(self, points, indptr, indices, weights, meta=None, landmarks=None, landmark_distances=None, labels=None, index=None):
+        self.points = points
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.meta = meta or {}
+        self.landmarks = landmarks
+        self.landmark_distances = landmark_distances
+        self.labels = labels
+        self.index = index
+
+    @classmethod
+    def from_edges(cls, points, rows, cols, costs=None, meta=None):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        keep = rows != cols
+        lo = np.minimum(rows[keep], cols[keep])
+        hi = np.maximum(rows[keep], cols[keep])
+        pairs, first = np.unique(np.column_stack([lo, hi]).reshape(-1, 2), axis=0, return_index=True)
+        if costs is None:
+            pair_costs = np.linalg.norm(points[pairs[:, 0]] - points[pairs[:, 1]], axis=1)
+        else:
+            pair_costs = np.asarray(costs, dtype=float)[keep][first]
+        src = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        dst = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        weights = np.concatenate([pair_costs, pair_costs])
+        order = np.lexsort((dst, src))
+        indptr = np.zeros(len(points) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(points)), out=indptr[1:])
+        return cls(points, indptr, dst[order].astype(np.int32), weights[order], meta)
+
+    @property
+    def num_nodes(self):
+        return len(self.points)
+
+    @property
+    def num_edges(self):
+        return len(self.indices) // 2
+
+    def neighbors(self, i):
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        return self.indices[lo:hi], self.weights[lo:hi]
+
+    def edge_pairs(self):
+        rows = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+        cols = np.asarray(self.indices, dtype=np.int64)
+        keep = rows < cols
+        return rows[keep], cols[keep], np.asarray(self.weights)[keep]
+
+    def save(self, path, map_hash=None, params=None):
+        meta = dict(self.meta)
+        meta.update({
+            'format': FORMAT_VERSION,
+            'map_hash': map_hash,
+            'params': normalize_params(params),
+            'num_nodes': int(self.num_nodes),
+            'num_edges': int(self.num_edges),
+        })
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name, dtype in zip(ARRAYS, DTYPES):
+            np.save(os.path.join(tmp_path, f'{name}.npy'), np.asarray(getattr(self, name), dtype=dtype))
+        for name, dtype in OPTIONAL_ARRAYS.items():
+            if getattr(self, name) is not None:
+                np.save(os.path.join(tmp_path, f'{name}.npy'), np.asarray(getattr(self, name), dtype=dtype))
+        if self.index is not None:
+            meta['index'] = sorted(self.index)
+            for name, array in self.index.items():
+                np.save(os.path.join(tmp_path, f'index_{name}.npy'), array)
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, sort_keys=True)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        self.meta = meta
+
+    @classmethod
+    def load(cls, path, map_hash=None, params=None, mmap=True):
+        meta_path = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('format') != FORMAT_VERSION:
+            return None
+        if map_hash is not None and meta.get('map_hash') != map_hash:
+            return None
+        if params is not None and meta.get('params') != normalize_params(params):
+            return None
+        mmap_mode = 'r' if mmap else None
+        arrays = [np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode) for name in ARRAYS]
+        optional = {}
+        for name in OPTIONAL_ARRAYS:
+            array_path = os.path.join(path, f'{name}.npy')
+            if os.path.exists(array_path):
+                optional[name] = np.load(array_path, mmap_mode=mmap_mode)
+        if 'index' in meta:
+            optional['index'] = {name: np.load(os.path.join(path, f'index_{name}.npy'), mmap_mode=mmap_mode) for name in meta['index']}
+        return cls(*arrays, meta=meta, **optional)
+
+
+class NodeList:
+    # the roadmap's node list over a points array: base nodes are read from
+    # the array as tuples, nodes added afterwards live in a plain list
+    def __init__(self, points):
+        # plain ndarray views: np.memmap slicing is several times slower
+        self.points = np.asarray(points)
+        self.base = len(points)
+        self.extra = []
+
+    def __len__(self):
+        return self.base + len(self.extra)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i < self.base:
+            return tuple(self.points[i].tolist())
+        return self.extra[i - self.base]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __array__(self, dtype=None, copy=None):
+        points = np.asarray(self.points, dtype=float)
+        if self.extra:
+            points = np.vstack([points, np.asarray(self.extra, dtype=float).reshape(-1, 2)])
+        return points if dtype is None else points.astype(dtype)
+
+    def append(self, node):
+        self.extra.append(node)
+
+    def __delitem__(self, key):
+        start = key.indices(len(self))[0]
+        if key.stop not in (None, len(self)):
+            raise TypeError('only trailing nodes can be deleted')
+        if start < self.base:
+            self.points, self.base, self.extra = self.points[:start], start, []
+        else:
+            del self.extra[start - self.base:]
+
+
+class AdjacencyList:
+    # the roadmap's adjacency lists over CSR arrays: a row becomes an ordinary
+    # list of (neighbour, cost) the first time it is read and edits go there
+    def __init__(self, indptr, indices, weights):
+        self.indptr = np.asarray(indptr)
+        self.indices = np.asarray(indices)
+        self.weights = np.asarray(weights)
+        self.base = len(indptr) - 1
+        self.rows = {}
+        self.extra = []
+
+    def __len__(self):
+        return self.base + len(self.extra)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if i >= self.base:
+            return self.extra[i - self.base]
+        row = self.rows.get(i)
+        if row is None:
+            lo, hi = self.indptr[i:i + 2].tolist()
+            row = self.rows[i] = list(zip(self.indices[lo:hi].tolist(), self.weights[lo:hi].tolist()))
+        return row
+
+    def __setitem__(self, i, row):
+        if i < 0:
+            i += len(self)
+        if i >= self.base:
+            self.extra[i - self.base] = row
+        else:
+            self.rows[i] = row
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def append(self, row):
+        self.extra.append(row)
+
+    def __delitem__(self, key):
+        start = key.indices(len(self))[0]
+        if key.stop not in (None, len(self)):
+            raise TypeError('only trailing rows can be deleted')
+        if start < self.base:
+            self.rows = {i: row for i, row in self.rows.items() if i < start}
+            self.base, self.extra = start, []
+        else:
+            del self.extra[start - self.base:]
+
+
+class EdgeSet:
+    # the roadmap's set of (i, j) edge keys, i < j; keys stored in the CSR
+    # arrays are found by a binary search of row i, edits are kept aside
+    def __init__(self, indptr, indices):
+        self.indptr = np.asarray(indptr)
+        self.indices = np.asarray(indices)
+        self.base = len(indptr) - 1
+        self.stored = len(indices) // 2
+        self.added = set()
+        self.removed = set()
+
+    def _stored(self, key):
+        i, j = key
+        if j >= self.base:
+            return False
+        lo, hi = self.indptr[i:i + 2].tolist()
+        k = lo + int(np.searchsorted(self.indices[lo:hi], j))
+        return k < hi and self.indices[k] == j
+
+    def __contains__(self, key):
+        return key in self.added or (key not in self.removed and self._stored(key))
+
+    def __len__(self):
+        return self.stored - len(self.removed) + len(self.added)
+
+    def __iter__(self):
+        rows = np.repeat(np.arange(self.base), np.diff(self.indptr))
+        cols = np.asarray(self.indices, dtype=np.int64)
+        keep = rows < cols
+        for key in zip(rows[keep].tolist(), cols[keep].tolist()):
+            if key not in self.removed:
+                yield key
+        yield from self.added
+
+    def add(self, key):
+        if key in self.removed:
+            self.removed.remove(key)
+        elif not self._stored(key):
+            self.added.add(key)
+
+    def remove(self, key):
+        if key in self.added:
+            self.added.remove(key)
+        elif key not in self.removed and self._stored(key):
+            self.removed.add(key)
+        else:
+            raise KeyError(key)
@@ -0,0 +1,121 @@
+import numpy as np
+
+
+class CanvasRenderer:
+    def __init__(self, canvas, map_size, raster_edges=2000, edge_color='blue', node_color='blue'):
+        self.canvas = canvas
+        self.map_size = map_size
+        self.raster_edges = raster_edges
+        self.edge_color = edge_color
+        self.node_color = node_color
+        self.width = None
+        self.height = None
+        self.roadmap_key = None
+        self.obstacles_key = None
+        self.rasterize = False
+        self.raster = None
+        self.raster_key = None
+        self.photo = None
+        self.items = {}
+        self.node_items = []
+        self.points = np.empty((0, 2))
+        self.pairs = np.empty((0, 2), dtype=np.int64)
+
+    @property
+    def scale(self):
+        return self.width / self.map_size[0], self.height / self.map_size[1]
+
+    def resize(self, width, height):
+        if (width, height) == (self.width, self.height):
+            return
+        if self.width is not None:
+            self.canvas.scale('scaled', 0, 0, width / self.width, height / self.height)
+        self.width, self.height = width, height
+        if self.rasterize:
+            self._draw_raster()
+        else:
+            self._place_nodes()
+
+    def draw_obstacles(self, obstacles):
+        key = tuple(map(tuple, obstacles))
+        if key == self.obstacles_key:
+            return
+        self.obstacles_key = key
+        self.canvas.delete('obstacle')
+        sx, sy = self.scale
+        for x0, y0, x1, y1 in key:
+            self.canvas.create_rectangle(x0 * sx, y0 * sy, x1 * sx, y1 * sy, fill='black', tags=('scaled', 'obstacle'))
+        self.canvas.tag_raise('obstacle')
+
+    def draw_roadmap(self, roadmap):
+        key = (id(roadmap), roadmap.version, len(roadmap.nodes))
+        if key == self.roadmap_key:
+            return
+        self.roadmap_key = key
+        self.points = np.asarray(roadmap.nodes, dtype=float).reshape(-1, 2)
+        self.pairs = np.array(sorted(roadmap.edge_set), dtype=np.int64).reshape(-1, 2)
+        self.canvas.delete('roadmap')
+        self.node_items = []
+        self.rasterize = len(self.pairs) > self.raster_edges
+        if self.rasterize:
+            self._draw_raster()
+        else:
+            self._draw_vectors()
+        self.canvas.tag_lower('roadmap')
+
+    def _draw_vectors(self):
+        sx, sy = self.scale
+        points = (self.points * (sx, sy)).tolist()
+        for i, j in self.pairs.tolist():
+            (x1, y1), (x2, y2) = points[i], points[j]
+            self.canvas.create_line(x1, y1, x2, y2, fill=self.edge_color, width=1, stipple='gray50', tags=('scaled', 'roadmap'))
+        # nodes keep their pixel size, so they are placed rather than scaled
+        self.node_items = [self.canvas.create_oval(0, 0, 0, 0, fill=self.node_color, tags=('node', 'roadmap')) for _ in points]
+        self._place_nodes()
+
+    def _place_nodes(self, radius=3):
+        sx, sy = self.scale
+        for item, (x, y) in zip(self.node_items, (self.points * (sx, sy)).tolist()):
+            self.canvas.coords(item, x - radius, y - radius, x + radius, y + radius)
+
+    def _draw_raster(self):
+        from PIL import Image, ImageDraw, ImageTk
+        key = (self.roadmap_key, self.width, self.height)
+        if key != self.raster_key:
+            image = Image.new('RGBA', (max(int(self.width), 1), max(int(self.height), 1)), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(image)
+            points = self.points * self.scale
+            for i, j in self.pairs.tolist():
+                draw.line((*points[i], *points[j]), fill=self.edge_color, width=1)
+            for x, y in points.tolist():
+                draw.ellipse((x - 1.5, y - 1.5, x + 1.5, y + 1.5), fill=self.node_color)
+            self.raster = image
+            self.raster_key = key
+        self.photo = ImageTk.PhotoImage(self.raster)
+        self.canvas.delete('raster')
+        self.canvas.create_image(0, 0, image=self.photo, anchor='nw', tags=('roadmap', 'raster'))
+        self.canvas.tag_lower('raster')
+
+    def _item(self, name, create):
+        item = self.items.get(name)
+        if item is None:
+            item = self.items[name] = create()
+        return item
+
+    def draw_path(self, name, path, color, width=2):
+        sx, sy = self.scale
+        item = self._item(name, lambda: self.canvas.create_line(0, 0, 0, 0, fill=color, width=width, tags=('scaled', 'path')))
+        if len(path) < 2:
+            self.canvas.itemconfigure(item, state='hidden')
+            return
+        coords = (np.asarray(path, dtype=float) * (sx, sy)).ravel().tolist()
+        self.canvas.coords(item, *coords)
+        self.canvas.itemconfigure(item, state='normal')
+        self.canvas.tag_raise(item)
+
+    def draw_robot(self, name, position, color, radius=5):
+        sx, sy = self.scale
+        item = self._item(name, lambda: self.canvas.create_oval(0, 0, 0, 0, fill=color, tags=('scaled', 'robot')))
+        x, y = position[0] * sx, position[1] * sy
+        self.canvas.coords(item, x - radius, y - radius, x + radius, y + radius)
+        self.canvas.tag_raise(item)
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+def pyplot(headless=False):
+    import matplotlib
+    if headless:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def edge_polyline(points, rows, cols):
+    points = np.asarray(points, dtype=float)
+    segments = np.stack([points[rows], points[cols], np.full((len(rows), 2), np.nan)], axis=1)
+    return segments.reshape(-1, 2)
+
+
+def plot_roadmap(points, rows, cols, path=None, smoothed=None, obstacle_map=None, rects=None, start=None, goal=None, output=None):
+    plt = pyplot(headless=output is not None)
+    fig, ax = plt.subplots()
+    if obstacle_map is not None:
+        ax.imshow(obstacle_map, cmap='gray', origin='lower')
+    for x0, y0, x1, y1 in rects if rects is not None else []:
+        ax.add_patch(plt.Rectangle((x0, y0), x1 - x0, y1 - y0, color='black'))
+    lines = edge_polyline(points, rows, cols)
+    ax.plot(lines[:, 0], lines[:, 1], 'k-', lw=0.5)
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    ax.scatter(points[:, 0], points[:, 1], c='b', s=4)
+    if path:
+        path_x, path_y = zip(*path)
+        ax.plot(path_x, path_y, 'r-', lw=2)
+        start = path[0] if start is None else start
+        goal = path[-1] if goal is None else goal
+    if smoothed:
+        smooth_x, smooth_y = zip(*smoothed)
+        ax.plot(smooth_x, smooth_y, 'g-', lw=2)
+    if start is not None:
+        ax.scatter([start[0]], [start[1]], c='g', marker='o')
+    if goal is not None:
+        ax.scatter([goal[0]], [goal[1]], c='r', marker='x')
+    if output is None:
+        plt.show()
+    else:
+        fig.savefig(output)
+    plt.close(fig)
@@ -0,0 +1,49 @@
+import itertools
+import random
+import types
+import numpy as np
+import pytest
+from prmplanner import roadmap as roadmap_module
+from prmplanner.cli import parse_args
+from prmplanner.roadmap import PRM
+
+OBSTACLES = [(20, 0, 30, 70), (50, 30, 60, 100), (70, 10, 90, 20)]
+
+
+def demo_prm(seed, num_nodes=800):
+    random.seed(seed)
+    np.random.seed(seed)
+    return PRM((5, 5), (95, 95), num_nodes, (100, 100), OBSTACLES)
+
+
+def test_costs_never_increase_and_all_nodes_are_used():
+    for seed in range(5):
+        prm = demo_prm(seed)
+        results = list(prm.anytime(batch=50, min_improvement=None))
+        costs = [result['cost'] for result in results]
+        assert costs == sorted(costs, reverse=True)
+        assert results[-1]['path']
+        assert results[-1]['nodes'] == len(prm.nodes) == 800
+
+
+def test_patience_stops_once_paths_stop_improving():
+    prm = demo_prm(0)
+    # nothing counts as an improvement after the first path
+    results = list(prm.anytime(batch=50, min_improvement=1.0, patience=3))
+    first = next(i for i, result in enumerate(results) if result['path'])
+    assert len(results) - first == 4
+    assert results[-1]['nodes'] < 800
+
+
+def test_time_budget_stops_before_a_round_would_overrun(monkeypatch):
+    # every clock read advances one second, so each round takes one second
+    monkeypatch.setattr(roadmap_module, 'time', types.SimpleNamespace(perf_counter=itertools.count().__next__))
+    prm = demo_prm(0)
+    results = list(prm.anytime(batch=20, time_budget=10, min_improvement=None))
+    assert [result['elapsed'] for result in results] == [2, 4, 6, 8, 10]
+    assert results[-1]['nodes'] < 800
+
+
+def test_cli_rejects_a_roadmap_cache_with_a_time_budget():
+    with pytest.raises(SystemExit):
+        parse_args(['--rects', '[]', '--map-size', '10', '10', '--start', '1', '1', '--goal', '9', '9', '--time-budget', '1', '--roadmap', 'cache'])
@@ -0,0 +1,58 @@
+import random
+from prmplanner.components import UnionFind
+
+
+def components_of(components):
+    return sorted(sorted(i for i in range(len(components)) if components.find(i) == root)
+                  for root in range(len(components)) if components.find(root) == root)
+
+
+def test_union_joins_components():
+    components = UnionFind(5)
+    assert components.union(0, 1)
+    assert components.union(3, 4)
+    assert not components.union(1, 0)
+    assert components.count == 3
+    assert components.connected(0, 1) and components.connected(4, 3)
+    assert not components.connected(1, 2)
+    assert components.component_size(1) == 2
+    assert components_of(components) == [[0, 1], [2], [3, 4]]
+
+
+def test_rollback_restores_unions_and_added_nodes():
+    rng = random.Random(0)
+    components = UnionFind(30)
+    for _ in range(15):
+        components.union(rng.randrange(30), rng.randrange(30))
+    before, count = components_of(components), components.count
+    mark = components.checkpoint()
+    assert components.tracking
+    for _ in range(5):
+        components.add()
+    for _ in range(40):
+        components.union(rng.randrange(35), rng.randrange(35))
+    components.rollback(mark)
+    assert not components.tracking
+    assert len(components) == 30
+    assert components.count == count
+    assert components_of(components) == before
+
+
+def test_nested_rollback_keeps_the_outer_checkpoint():
+    components = UnionFind(6)
+    outer = components.checkpoint()
+    components.union(0, 1)
+    inner = components.checkpoint()
+    node = components.add()
+    components.union(1, node)
+    components.union(2, 3)
+    components.rollback(inner)
+    assert components.tracking
+    assert len(components) == 6
+    assert components.connected(0, 1)
+    assert not components.connected(2, 3)
+    components.union(4, 5)
+    components.rollback(outer)
+    assert not components.tracking
+    assert components.count == 6
+    assert not any(components.connected(i, i + 1) for i in range(5))
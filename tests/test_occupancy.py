@@ -0,0 +1,66 @@
+import random
+import numpy as np
+import pytest
+from prmplanner import OccupancyGrid, OccupancyPyramid, Roadmap
+from prmplanner.occupancy import inflate_obstacles
+
+
+def blank_map(size=50):
+    return np.full((size, size), 255, dtype=np.uint8)
+
+
+def test_patch_overhanging_the_map_is_clipped():
+    grid = OccupancyGrid(blank_map())
+    assert grid.update(45, 45, np.zeros((10, 10), dtype=np.uint8)) == (45, 45, 50, 50)
+    blocked = grid.occupancy_map == 0
+    assert blocked[45:, 45:].all() and blocked.sum() == 25
+
+
+def test_negative_offset_does_not_wrap_around():
+    grid = OccupancyGrid(blank_map())
+    assert grid.update(-5, -3, np.zeros((10, 10), dtype=np.uint8)) == (0, 0, 5, 7)
+    blocked = grid.occupancy_map == 0
+    assert blocked[:7, :5].all() and blocked.sum() == 35
+    assert grid.update(-20, 60, np.zeros((10, 10), dtype=np.uint8)) is None
+
+
+def test_patch_is_inflated_like_the_whole_map():
+    rng = np.random.default_rng(0)
+    for checker_type in (OccupancyGrid, OccupancyPyramid):
+        for _ in range(20):
+            obstacle_map = np.where(rng.random((60, 60)) < 0.01, 0, 255).astype(np.uint8)
+            inflated, _ = inflate_obstacles(obstacle_map, 3)
+            checker = checker_type(inflated, obstacle_map=obstacle_map.copy(), robot_radius=3)
+            x, y = rng.integers(-8, 60, 2)
+            patch = np.where(rng.random((10, 12)) < 0.3, 0, 255).astype(np.uint8)
+            checker.update(x, y, patch)
+            expected = obstacle_map.copy()
+            x0, y0 = max(x, 0), max(y, 0)
+            expected[y0:y + 10, x0:x + 12] = patch[y0 - y:, x0 - x:][:60 - y0, :60 - x0]
+            assert (checker.occupancy_map == inflate_obstacles(expected, 3)[0]).all()
+
+
+def test_inflated_checker_needs_the_obstacle_map():
+    inflated, _ = inflate_obstacles(blank_map(), 3)
+    with pytest.raises(ValueError):
+        OccupancyGrid(inflated, robot_radius=3).update(10, 10, np.zeros((2, 2)))
+
+
+def test_repair_on_the_map_edge_keeps_clearance():
+    random.seed(0)
+    np.random.seed(0)
+    obstacle_map = blank_map(60)
+    inflated, _ = inflate_obstacles(obstacle_map, 3)
+    checker = OccupancyGrid(inflated, obstacle_map=obstacle_map, robot_radius=3)
+    roadmap = Roadmap(checker.map_size, checker, 300, k=8).build()
+    roadmap.update_occupancy(50, -4, np.zeros((20, 20), dtype=np.uint8))
+    # the wall spans x >= 50, y <= 15; inflation blocks three pixels beyond it
+    blocked = checker.occupancy_map == 0
+    assert blocked[:16, 47:].all() and blocked[:19, 50:].all()
+    assert not blocked[19:, :].any() and not blocked[:, :47].any()
+    live = [i for i in range(len(roadmap.nodes)) if i not in roadmap.blocked_nodes]
+    assert not checker.points_in_obstacle([roadmap.nodes[i] for i in live]).any()
+    pairs = sorted(roadmap.edge_set)
+    starts = [roadmap.nodes[i] for i, _ in pairs]
+    ends = [roadmap.nodes[j] for _, j in pairs]
+    assert not checker.segments_in_obstacle(starts, ends).any()
@@ -0,0 +1,18 @@
+import numpy as np
+from prmplanner.neighbors import build_index, knn_edges
+from prmplanner.parallel import parallel_knn_edges
+from prmplanner.pyramid import OccupancyPyramid
+
+
+def test_workers_share_the_index_and_match_the_serial_edges():
+    rng = np.random.default_rng(0)
+    occupancy_map = np.full((200, 200), 255, dtype=np.uint8)
+    occupancy_map[50:150, 90:110] = 0
+    checker = OccupancyPyramid(occupancy_map)
+    points = rng.uniform(0, 200, (3000, 2))
+    for method in ('kdtree', 'grid'):
+        index = build_index(points, method)
+        rows, cols = knn_edges(index, 5, checker, 15)
+        for shared in (index, None):
+            parallel_rows, parallel_cols = parallel_knn_edges(points, 5, checker, 15, method, workers=2, shard_size=500, index=shared)
+            assert np.array_equal(rows, parallel_rows) and np.array_equal(cols, parallel_cols)
@@ -0,0 +1,52 @@
+import numpy as np
+from prmplanner import OccupancyPyramid
+from prmplanner.collision import points_in_occupancy, segments_in_occupancy
+
+
+def random_map(rng):
+    height, width = rng.integers(20, 90, 2)
+    occupancy_map = np.full((height, width), 255, dtype=np.uint8)
+    for _ in range(rng.integers(0, 8)):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        w, h = rng.integers(1, 15, 2)
+        occupancy_map[y:y + h, x:x + w] = 0
+    occupancy_map[rng.random((height, width)) < 0.005] = 0
+    return occupancy_map
+
+
+def random_segments(rng, occupancy_map, count=200):
+    height, width = occupancy_map.shape
+    lo, hi = (-5, -5), (width + 5, height + 5)
+    return rng.uniform(lo, hi, (count, 2)), rng.uniform(lo, hi, (count, 2))
+
+
+def test_pyramid_matches_the_flat_raster_check():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        occupancy_map = random_map(rng)
+        starts, ends = random_segments(rng, occupancy_map)
+        expected = segments_in_occupancy(starts, ends, occupancy_map)
+        expected_points = points_in_occupancy(starts, occupancy_map)
+        for levels in range(7):
+            pyramid = OccupancyPyramid(occupancy_map, levels)
+            assert (pyramid.segments_in_obstacle(starts, ends) == expected).all()
+            assert (pyramid.points_in_obstacle(starts) == expected_points).all()
+
+
+def test_update_matches_a_rebuild():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        occupancy_map = random_map(rng)
+        height, width = occupancy_map.shape
+        levels = int(rng.integers(1, 7))
+        pyramid = OccupancyPyramid(occupancy_map.copy(), levels)
+        for _ in range(3):
+            x, y = rng.integers(-10, width), rng.integers(-10, height)
+            patch = np.where(rng.random(rng.integers(1, 20, 2)) < 0.5, 0, 255).astype(np.uint8)
+            pyramid.update(x, y, patch)
+        rebuilt = OccupancyPyramid(pyramid.occupancy_map.copy(), levels)
+        for level, array in zip(pyramid.pyramid, rebuilt.pyramid):
+            assert (level == array).all()
+        starts, ends = random_segments(rng, occupancy_map)
+        expected = segments_in_occupancy(starts, ends, pyramid.occupancy_map)
+        assert (pyramid.segments_in_obstacle(starts, ends) == expected).all()
@@ -0,0 +1,40 @@
+import random
+import numpy as np
+from prmplanner import Roadmap
+
+OBSTACLES = [(20, 20, 30, 100), (40, 40, 100, 50), (40, 80, 100, 90)]
+
+
+def build():
+    random.seed(0)
+    np.random.seed(0)
+    return Roadmap((130, 130), OBSTACLES, 600, k=8).build()
+
+
+def path_edges(roadmap, path):
+    ids = [roadmap.snap(point) for point in path[1:-1]]
+    return {(i, j) if i < j else (j, i) for i, j in zip(ids, ids[1:])}
+
+
+def test_repeated_queries_hit_the_cache():
+    roadmap = build()
+    first = roadmap.query((5, 5), (120, 120))
+    version = roadmap.version
+    assert roadmap.query((5, 5), (120, 120)) == first
+    assert roadmap.version == version
+    assert roadmap.query_cache.hits == 1
+
+
+def test_removing_an_edge_invalidates_cached_paths():
+    roadmap = build()
+    for _ in range(3):
+        # the third query to one goal is answered from its cached tree
+        roadmap.query((6, 5), (120, 120))
+        path = roadmap.query((5, 5), (120, 120))
+    i, j = sorted(path_edges(roadmap, path))[0]
+    assert roadmap.remove_edge(i, j)
+    fresh = roadmap.query((5, 5), (120, 120))
+    assert fresh != path
+    assert (i, j) not in path_edges(roadmap, fresh)
+    assert roadmap.add_edge(i, j, check=False)
+    assert roadmap.query((5, 5), (120, 120)) == path
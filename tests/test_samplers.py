@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from prmplanner import Roadmap
+from prmplanner.collision import RectObstacles
+from prmplanner.samplers import make_sampler
+from prmplanner.stats import PlannerStats
+
+
+def test_small_calls_keep_the_rest_of_a_batch():
+    checker = RectObstacles([(20, 20, 60, 60)])
+    for name in ('uniform', 'halton', 'sobol', 'gaussian'):
+        sampler = make_sampler(name, (100, 100), checker, seed=0)
+        pieces = [sampler.sample(7) for _ in range(20)]
+        assert sampler.drawn == 1024
+        whole = make_sampler(name, (100, 100), checker, seed=0).sample(140)
+        assert (np.vstack(pieces) == whole).all()
+
+
+def test_quasi_random_points_are_not_skipped():
+    sampler = make_sampler('halton', (1, 1), seed=0)
+    points = np.vstack([sampler.sample(3, batch_size=8) for _ in range(8)])
+    expected = make_sampler('halton', (1, 1), seed=0).candidates(24)
+    assert (points == expected).all()
+
+
+def test_short_sample_warns_and_returns_what_it_found():
+    checker = RectObstacles([(0, 0, 100, 90)])
+    sampler = make_sampler('uniform', (100, 100), checker, seed=0)
+    with pytest.warns(RuntimeWarning, match='found only'):
+        points = sampler.sample(50, batch_size=64, max_batches=4)
+    assert 0 < len(points) < 50
+    assert not checker.points_in_obstacle(points).any()
+    blocked = RectObstacles([(0, 0, 100, 100)])
+    with pytest.warns(RuntimeWarning):
+        assert len(make_sampler('uniform', (100, 100), blocked, seed=0).sample(5, max_batches=2)) == 0
+
+
+def test_roadmap_counts_the_samples_it_keeps():
+    stats = PlannerStats()
+    roadmap = Roadmap((100, 100), [(20, 20, 60, 60)], 50, stats=stats)
+    for _ in range(3):
+        roadmap.grow(50)
+    counters = stats.counters
+    assert counters['samples_accepted'] == len(roadmap.nodes) == 150
+    spare = len(roadmap.point_sampler.spare)
+    assert counters['samples_drawn'] - counters['samples_rejected'] == counters['samples_accepted'] + spare
@@ -0,0 +1,87 @@
+import collections
+import concurrent.futures
+import threading
+from prmplanner.scheduler import PlanScheduler
+
+
+class FakeRoot:
+    # stands in for the Tk loop: run() calls every after callback straight
+    # away, including the ones they schedule, until none is left
+    def __init__(self):
+        self.calls = collections.deque()
+
+    def after(self, ms, callback):
+        self.calls.append(callback)
+        return callback
+
+    def after_cancel(self, call):
+        if call in self.calls:
+            self.calls.remove(call)
+
+    def run(self):
+        while self.calls:
+            self.calls.popleft()()
+
+
+def scheduler_with_log(root, **kwargs):
+    delivered = []
+    scheduler = PlanScheduler(root, lambda key, result, latency: delivered.append((key, result)), **kwargs)
+    return scheduler, delivered
+
+
+def test_superseded_results_are_dropped():
+    root = FakeRoot()
+    scheduler, delivered = scheduler_with_log(root, workers=2)
+    gate = threading.Event()
+    scheduler.submit('tick', lambda: gate.wait() and 1)
+    first = scheduler.pending['tick']
+    scheduler.submit('tick', lambda: 2)
+    concurrent.futures.wait([scheduler.pending['tick']])
+    root.run()
+    assert delivered == [('tick', 2)]
+    gate.set()
+    concurrent.futures.wait([first])
+    scheduler.submit('tick', lambda: 3)
+    root.run()
+    assert delivered == [('tick', 2), ('tick', 3)]
+    assert scheduler.dropped == 1
+    scheduler.close()
+
+
+def test_queued_jobs_are_cancelled_by_newer_ones():
+    root = FakeRoot()
+    scheduler, delivered = scheduler_with_log(root, workers=1)
+    gate = threading.Event()
+    scheduler.submit('reference', gate.wait)
+    assert scheduler.submit('tick', lambda: 1) == 1
+    assert scheduler.submit('tick', lambda: 2) == 2
+    assert scheduler.dropped == 1
+    gate.set()
+    concurrent.futures.wait(list(scheduler.pending.values()))
+    root.run()
+    assert sorted(delivered) == [('reference', True), ('tick', 2)]
+    assert not scheduler.pending
+    scheduler.close()
+
+
+def test_errors_are_reported_and_polling_goes_on():
+    errors = []
+    root = FakeRoot()
+    scheduler, delivered = scheduler_with_log(root, on_error=lambda key, error: errors.append((key, str(error))))
+
+    def fail():
+        raise RuntimeError('no path')
+
+    scheduler.submit('tick', fail)
+    root.run()
+    scheduler.submit('tick', lambda: 4)
+    root.run()
+    assert errors == [('tick', 'no path')]
+    assert delivered == [('tick', 4)]
+    scheduler.callback = lambda key, result, latency: 1 / 0
+    scheduler.submit('tick', lambda: 5)
+    root.run()
+    assert scheduler.errors == 2
+    assert errors[-1][0] == 'tick'
+    assert scheduler.polling is None
+    scheduler.close()
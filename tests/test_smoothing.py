@@ -0,0 +1,33 @@
+import os
+import random
+import numpy as np
+from prmplanner import OccupancyGrid, Roadmap, load_inflated_map, smooth_path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def raster_roadmap():
+    random.seed(0)
+    np.random.seed(0)
+    _, inflated_map, _ = load_inflated_map(os.path.join(ROOT, 'Obsticle.png'), 5, cache_dir=None)
+    checker = OccupancyGrid(inflated_map)
+    return Roadmap(checker.map_size, checker, 1500, k=8).build(), checker
+
+
+def test_smoothed_paths_stay_free_on_raster_map():
+    roadmap, checker = raster_roadmap()
+    rng = np.random.default_rng(0)
+    checked = 0
+    while checked < 30:
+        i, j = rng.integers(0, len(roadmap.nodes), 2)
+        if not roadmap.connected(i, j):
+            continue
+        path = roadmap.query(roadmap.nodes[i], roadmap.nodes[j])
+        if len(path) < 3:
+            continue
+        checked += 1
+        for spline in (False, True):
+            points, length = smooth_path(path, checker, spline=spline, seed=checked)
+            points = np.asarray(points)
+            assert not checker.segments_in_obstacle(points[:-1], points[1:]).any()
+            assert tuple(points[0]) == tuple(path[0]) and tuple(points[-1]) == tuple(path[-1])
@@ -0,0 +1,54 @@
+import random
+import numpy as np
+from prmplanner import Roadmap
+from prmplanner.nodestore import NodeStore
+from prmplanner.storage import RoadmapArrays
+
+OBSTACLES = [(20, 20, 30, 100), (40, 40, 100, 50), (40, 80, 100, 90)]
+
+
+def build(obstacles=OBSTACLES, k=8):
+    random.seed(0)
+    np.random.seed(0)
+    return Roadmap((130, 130), obstacles, 600, k=k).build()
+
+
+def test_roadmap_round_trip(tmp_path):
+    roadmap = build()
+    path = roadmap.query((5, 5), (120, 120))
+    roadmap.save(tmp_path / 'roadmap')
+    loaded = Roadmap((130, 130), OBSTACLES, 600, k=8)
+    assert loaded.load(tmp_path / 'roadmap')
+    assert list(loaded.nodes) == list(roadmap.nodes)
+    assert sorted(loaded.edge_set) == sorted(roadmap.edge_set)
+    assert loaded.components.count == roadmap.components.count
+    # coordinates survive exactly, so points of an earlier path still snap
+    assert all(isinstance(loaded.snap(point), int) for point in path[1:-1])
+    assert loaded.query((5, 5), (120, 120)) == path
+    for edit in (roadmap, loaded):
+        edit.add_obstacle((60, 0, 65, 130))
+    assert sorted(loaded.edge_set) == sorted(roadmap.edge_set)
+    assert loaded.query((5, 5), (120, 120)) == roadmap.query((5, 5), (120, 120))
+
+
+def test_load_rejects_changed_map_or_parameters(tmp_path):
+    build().save(tmp_path / 'roadmap')
+    assert not Roadmap((130, 130), OBSTACLES[:2], 600, k=8).load(tmp_path / 'roadmap')
+    assert not Roadmap((130, 130), OBSTACLES, 600, k=5).load(tmp_path / 'roadmap')
+    assert Roadmap((130, 130), OBSTACLES, 600, k=8).load(tmp_path / 'roadmap')
+
+
+def test_node_store_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    nodes = NodeStore.from_points(rng.uniform(0, 100, (200, 2)))
+    rows = rng.integers(0, 200, 800)
+    cols = rng.integers(0, 200, 800)
+    nodes.set_edges(rows, cols)
+    nodes.remove_edge(int(rows[0]), int(cols[0]))
+    nodes.to_arrays().save(tmp_path / 'nodes', 'map', {'k': 5})
+    assert RoadmapArrays.load(tmp_path / 'nodes', 'other', {'k': 5}) is None
+    loaded = NodeStore.from_arrays(RoadmapArrays.load(tmp_path / 'nodes', 'map', {'k': 5}))
+    assert (np.asarray(loaded.points) == nodes.points).all()
+    for i in range(len(nodes)):
+        assert loaded.neighbors(i)[0].tolist() == nodes.neighbors(i)[0].tolist()
+    assert loaded.shortest_path(0, 199)[0] == nodes.shortest_path(0, 199)[0]